@@ -5,6 +5,9 @@ from django.contrib import admin
 from django.contrib import admin
 from .models import AccessPermission, AccessRequest
 
+# The match column renders Match.__str__, which needs both teams
+RESOURCES = ('match__team1', 'match__team2', 'player', 'team')
+
 # ----------------------------
 # Admin for AccessPermission
 # ----------------------------
@@ -19,6 +22,7 @@ class AccessPermissionAdmin(admin.ModelAdmin):
         'active',
         'granted_at'
     )
+    list_select_related = ('user', 'main_user') + RESOURCES
     list_filter = ('access_type', 'active', 'granted_at')
     search_fields = ('user__username', 'main_user__username')
 
@@ -34,6 +38,7 @@ class AccessRequestAdmin(admin.ModelAdmin):
         'team',
         'requested_at'
     )
+    list_select_related = ('requester',) + RESOURCES
     list_filter = ('status', 'requested_at')
     search_fields = ('requester__username',)
 
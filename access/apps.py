@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccessConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'access'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the cache invalidation receivers)
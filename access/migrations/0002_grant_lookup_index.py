@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0001_initial'),
+        ('score', '0008_scoring_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accesspermission',
+            index=models.Index(fields=['user', 'active', 'access_type'], name='access_grant_lookup_idx'),
+        ),
+    ]
@@ -32,6 +32,12 @@ class AccessPermission(models.Model):
     active = models.BooleanField(default=True)
     granted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # PermissionResolver and granted_ids() always filter on these first
+            models.Index(fields=['user', 'active', 'access_type'], name='access_grant_lookup_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} -> {self.access_type} access to {self.match or self.player or self.team}"
 
@@ -0,0 +1,157 @@
+# access/permissions.py
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import AccessPermission
+from score.models import Match, Player, Team
+
+# Which AccessPermission column grants access to which resource
+GRANT_FIELDS = {
+    Match: 'match_id',
+    Player: 'player_id',
+    Team: 'team_id',
+}
+
+# A check matches grants of exactly its access type, as it always has:
+# a W grant alone does not let a user read the resource
+READ_TYPES = ('R',)
+WRITE_TYPES = ('W',)
+
+
+def access_types_for(perm_type):
+    return WRITE_TYPES if perm_type == 'W' else READ_TYPES
+
+
+# -----------------------------
+# Lazy queryset filters
+# -----------------------------
+def granted_ids(user, model, access_types=READ_TYPES):
+    """Subquery of ``model`` ids the user has an active grant for."""
+    field = GRANT_FIELDS[model]
+    return AccessPermission.objects.filter(
+        user=user, active=True, access_type__in=access_types, **{f'{field}__isnull': False}
+    ).values(field)
+
+
+def accessible_filter(user, model, perm_type='R'):
+    """Q object matching rows the user owns or has an active grant for."""
+    return Q(user=user) | Q(pk__in=granted_ids(user, model, access_types_for(perm_type)))
+
+
+# -----------------------------
+# Cross-request cache
+# -----------------------------
+# Every key embeds a per-user version token; bumping the token on grant/revoke
+# orphans all of that user's cached answers at once.
+def _version_key(user_id):
+    return f'access:perm:version:{user_id}'
+
+
+def cache_version(user_id):
+    """The user's current grant version; part of any cache key built from what they can read."""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(_version_key(user_id), version, None)
+    return version
+
+
+def _cache_key(user_id, model, obj_id, perm_type):
+    version = cache_version(user_id)
+    return f'access:perm:{user_id}:{version}:{model._meta.model_name}:{obj_id}:{perm_type}'
+
+
+def invalidate_user(user_id):
+    """Drop every cached permission answer for ``user_id``."""
+    cache.set(_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def cache_timeout():
+    # 0 keeps the cache request-scoped only
+    return getattr(settings, 'ACCESS_PERMISSION_CACHE_TIMEOUT', 0)
+
+
+# -----------------------------
+# Per-user resolver
+# -----------------------------
+class PermissionResolver:
+    """Loads every active grant of a user in one query and answers checks from memory.
+
+    Answers are memoised for the lifetime of the resolver (one request, see
+    ``get_resolver``) and, when ``ACCESS_PERMISSION_CACHE_TIMEOUT`` is set, in
+    Django's cache keyed by (user, object type, object id, access type).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._ids = None
+        self._memo = {}
+
+    def _load(self):
+        ids = {(model, perm): set() for model in GRANT_FIELDS for perm in ('R', 'W')}
+        if self.user.is_authenticated:
+            rows = AccessPermission.objects.filter(user=self.user, active=True).values_list(
+                'access_type', 'match_id', 'player_id', 'team_id'
+            )
+            for access_type, match_id, player_id, team_id in rows:
+                for model, obj_id in ((Match, match_id), (Player, player_id), (Team, team_id)):
+                    if obj_id is not None:
+                        ids[(model, access_type)].add(obj_id)
+        self._ids = ids
+
+    def ids(self, model, perm_type='R'):
+        """Set of ``model`` ids granted to the user (ownership not included)."""
+        if self._ids is None:
+            self._load()
+        result = set()
+        for access_type in access_types_for(perm_type):
+            result |= self._ids[(model, access_type)]
+        return result
+
+    def readable_ids(self, model):
+        return self.ids(model, 'R')
+
+    def writable_ids(self, model):
+        return self.ids(model, 'W')
+
+    def can(self, obj, perm_type='R'):
+        if not self.user.is_authenticated:
+            return False
+        if self.user.is_superuser or getattr(obj, 'user_id', None) == self.user.id:
+            return True
+        model = type(obj)
+        if model not in GRANT_FIELDS:
+            return False
+
+        memo_key = (model, obj.pk, perm_type)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        timeout = cache_timeout()
+        allowed = None
+        if timeout:
+            key = _cache_key(self.user.id, model, obj.pk, perm_type)
+            allowed = cache.get(key)
+        if allowed is None:
+            allowed = obj.pk in self.ids(model, perm_type)
+            if timeout:
+                cache.set(key, allowed, timeout)
+
+        self._memo[memo_key] = allowed
+        return allowed
+
+
+def get_resolver(user):
+    """Resolver shared by everything that checks ``user`` during one request.
+
+    ``request.user`` is the same object for the whole request, so the resolver
+    is simply pinned to it.
+    """
+    resolver = getattr(user, '_permission_resolver', None)
+    if resolver is None:
+        resolver = PermissionResolver(user)
+        user._permission_resolver = resolver
+    return resolver
@@ -0,0 +1,22 @@
+# access/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AccessPermission, AccessRequest
+from .permissions import invalidate_user
+
+
+# -----------------------------
+# Permission cache invalidation
+# -----------------------------
+@receiver(post_save, sender=AccessPermission)
+@receiver(post_delete, sender=AccessPermission)
+def permission_changed(sender, instance, **kwargs):
+    # Covers grants, deactivation (active=False saves) and revocation
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=AccessRequest)
+def access_request_approved(sender, instance, **kwargs):
+    if instance.status == 'A':
+        invalidate_user(instance.requester_id)
@@ -1,3 +1,110 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from access.models import AccessPermission, AccessRequest
+from access.permissions import PermissionResolver, get_resolver
+from score.models import Match, Player, Team
+
+
+# -------------------------------
+# Permission resolver
+# -------------------------------
+class PermissionResolverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', password='pw')
+        cls.viewer = User.objects.create_user('viewer', password='pw')
+        cls.admin = User.objects.create_superuser('admin', password='pw')
+        home = Team.objects.create(user=cls.owner, name='Home')
+        away = Team.objects.create(user=cls.owner, name='Away')
+        cls.read = Match.objects.create(user=cls.owner, match_number=1, team1=home, team2=away)
+        cls.write = Match.objects.create(user=cls.owner, match_number=2, team1=home, team2=away)
+        cls.revoked = Match.objects.create(user=cls.owner, match_number=3, team1=home, team2=away)
+        cls.player = Player.objects.create(user=cls.owner, name='Bat')
+        AccessPermission.objects.create(main_user=cls.owner, user=cls.viewer, match=cls.read, access_type='R')
+        AccessPermission.objects.create(main_user=cls.owner, user=cls.viewer, match=cls.write, access_type='W')
+        AccessPermission.objects.create(main_user=cls.owner, user=cls.viewer, match=cls.revoked, active=False)
+
+    def test_grants_match_their_access_type(self):
+        resolver = PermissionResolver(self.viewer)
+        self.assertEqual(
+            [(resolver.can(match, 'R'), resolver.can(match, 'W')) for match in (self.read, self.write, self.revoked)],
+            [(True, False), (False, True), (False, False)],
+        )
+        self.assertFalse(resolver.can(self.player, 'R'))
+
+    def test_owner_superuser_and_anonymous(self):
+        for user, allowed in ((self.owner, True), (self.admin, True), (AnonymousUser(), False)):
+            resolver = PermissionResolver(user)
+            self.assertEqual({resolver.can(self.revoked, perm) for perm in 'RW'}, {allowed})
+
+    def test_querysets_agree_with_the_resolver(self):
+        self.assertEqual(set(Match.objects.readable_by(self.viewer)), {self.read})
+        self.assertEqual(set(Match.objects.writable_by(self.viewer)), {self.write})
+        self.assertEqual(Match.objects.readable_by(self.owner).count(), 3)
+        self.assertFalse(Match.objects.readable_by(AnonymousUser()).exists())
+
+    def test_approving_a_request_needs_a_write_grant(self):
+        asker = User.objects.create_user('asker', password='pw')
+        access_request = AccessRequest.objects.create(requester=asker, match=self.read)
+        url = reverse('manage_match_requests', args=[self.read.id])
+        for user in (self.owner, self.viewer):  # owning the match or reading it is not enough
+            self.client.force_login(user)
+            response = self.client.post(url, {'request_id': access_request.id, 'action': 'approve'})
+            self.assertEqual(response.status_code, 403)
+        self.assertFalse(AccessPermission.objects.filter(user=asker).exists())
+
+
+# -------------------------------
+# Per-request memo and cross-request cache
+# -------------------------------
+class PermissionCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', password='pw')
+        cls.viewer = User.objects.create_user('viewer', password='pw')
+        home = Team.objects.create(user=cls.owner, name='Home')
+        away = Team.objects.create(user=cls.owner, name='Away')
+        cls.match = Match.objects.create(user=cls.owner, match_number=1, team1=home, team2=away)
+        cls.other = Match.objects.create(user=cls.owner, match_number=2, team1=home, team2=away)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_one_query_per_request_however_many_checks(self):
+        AccessPermission.objects.create(main_user=self.owner, user=self.viewer, match=self.match)
+        resolver = get_resolver(self.viewer)
+        self.assertIs(get_resolver(self.viewer), resolver)
+        with self.assertNumQueries(1):
+            answers = [resolver.can(match, perm) for match in (self.match, self.other) for perm in 'RWR']
+        self.assertEqual(answers, [True, False, True, False, False, False])
+
+    @override_settings(ACCESS_PERMISSION_CACHE_TIMEOUT=300)
+    def test_cached_answers_follow_grant_changes(self):
+        def can_read():
+            return PermissionResolver(self.viewer).can(self.match, 'R')  # a fresh request each time
+
+        self.assertFalse(can_read())
+        grant = AccessPermission.objects.create(main_user=self.owner, user=self.viewer, match=self.match)
+        self.assertTrue(can_read())
+        with self.assertNumQueries(0):
+            self.assertTrue(can_read())
+
+        grant.active = False
+        grant.save()
+        self.assertFalse(can_read())
+        grant.active = True
+        grant.save()
+        self.assertTrue(can_read())
+        grant.delete()
+        self.assertFalse(can_read())
+
+        # bulk_create sends no signal, so the cached answer stands...
+        AccessPermission.objects.bulk_create([
+            AccessPermission(main_user=self.owner, user=self.viewer, match=self.match),
+        ])
+        self.assertFalse(can_read())
+        AccessRequest.objects.create(requester=self.viewer, match=self.match, status='A')
+        self.assertTrue(can_read())  # ...until the approval invalidates it
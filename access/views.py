@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.http import HttpResponseForbidden
 from django.contrib.auth.forms import UserCreationForm
 from .models import AccessRequest, AccessPermission
+from .permissions import get_resolver
 from score.models import Match, Player, Team
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
@@ -71,14 +72,9 @@ def manage_requests(request, match_id=None, player_id=None, team_id=None):
         action = request.POST.get('action')  # 'approve' or 'reject'
         access_request = get_object_or_404(AccessRequest, id=req_id)
 
-        # Verify main user permission
-        perm = None
-        if access_request.match:
-            perm = AccessPermission.objects.filter(match=access_request.match, user=request.user, access_type='W', active=True).first()
-        elif access_request.player:
-            perm = AccessPermission.objects.filter(player=access_request.player, user=request.user, access_type='W', active=True).first()
-        elif access_request.team:
-            perm = AccessPermission.objects.filter(team=access_request.team, user=request.user, access_type='W', active=True).first()
+        # Verify main user permission: an explicit write grant, ownership alone is not enough
+        resource = access_request.match or access_request.player or access_request.team
+        perm = resource is not None and resource.pk in get_resolver(request.user).writable_ids(type(resource))
 
         if not perm and not request.user.is_superuser:
             return HttpResponseForbidden("You are not allowed to approve/reject requests.")
@@ -86,14 +82,14 @@ def manage_requests(request, match_id=None, player_id=None, team_id=None):
         # Approve request
         if action == 'approve':
             access_request.status = 'A'
-            AccessPermission.objects.create(
-                main_user=request.user,
+            AccessPermission.objects.get_or_create(
                 user=access_request.requester,
                 match=access_request.match,
                 player=access_request.player,
                 team=access_request.team,
                 access_type='R',  # default read-only
-                active=True
+                active=True,
+                defaults={'main_user': request.user},
             )
             messages.success(request, f"Access granted to {access_request.requester.username}.")
         # Reject request
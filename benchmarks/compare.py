@@ -0,0 +1,36 @@
+"""Compare two benchmarks.run reports: python -m benchmarks.compare before.json after.json"""
+import json
+import sys
+
+METRICS = (
+    ('throughput_rps', lambda s: s['throughput_rps']),
+    ('p50_ms', lambda s: s['latency_ms']['p50']),
+    ('p95_ms', lambda s: s['latency_ms']['p95']),
+    ('p99_ms', lambda s: s['latency_ms']['p99']),
+    ('queries', lambda s: s['queries_per_request']['mean']),
+)
+
+
+def compare(before, after):
+    rows = {}
+    for name in sorted(set(before['scenarios']) & set(after['scenarios'])):
+        old, new = before['scenarios'][name], after['scenarios'][name]
+        rows[name] = {}
+        for metric, pick in METRICS:
+            was, now = pick(old), pick(new)
+            change = round((now - was) / was * 100, 1) if was else None
+            rows[name][metric] = {'before': was, 'after': now, 'change_pct': change}
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit(__doc__)
+    with open(argv[0]) as first, open(argv[1]) as second:
+        report = compare(json.load(first), json.load(second))
+    sys.stdout.write(json.dumps(report, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""Compare scoring throughput of many concurrent matches under WSGI and ASGI.
+
+    python -m benchmarks.concurrency --matches 32 --balls 36 --threads 8 --output concurrency.json
+
+Every match has its own scorer posting deliveries one after the other (an
+OVER and a scorecard read after every six legal balls), and all the
+matches are scored at once. The same requests are replayed in each mode:
+
+    wsgi  the sync views through WSGIHandler, on --threads worker threads,
+          as a threaded WSGI server (gunicorn --threads) runs them
+    asgi  the async views through ASGIHandler on one event loop: the
+          application uvicorn serves from cricket.asgi
+
+Requests go through the real handlers and the full middleware stack, not the
+test client, but both handlers run in this process: no uvicorn or gunicorn is
+started, so sockets, HTTP parsing and worker processes are not measured.
+SQLite answers in microseconds where Oracle is a network round
+trip away, so --db-latency-ms adds that wait to every statement; it is the
+time a blocked WSGI thread spends doing nothing. Statements inside a
+transaction are left alone: SQLite holds one write lock for the whole
+transaction, where Oracle locks only the match's rows, so waiting there would
+queue every match behind one lock in both modes. The write path of a ball
+therefore runs at SQLite speed and only its reads wait. Point
+DJANGO_SETTINGS_MODULE at cricket.settings.select (with --db-latency-ms 0) to
+measure against Oracle itself.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.run import EVENTS, summarize
+
+# per mode: (update_ball URL name, scorecard URL name)
+MODES = {
+    'wsgi': ('update_ball', 'scorecard'),
+    'asgi': ('async_update_ball', 'async_scorecard'),
+}
+
+
+# -------------------------------
+# One match's scorer
+# -------------------------------
+def scorer(match, balls, rng, names):
+    """Yield (method, path, body) for one match's requests; each yield gets back the JSON response."""
+    from django.urls import reverse
+
+    update_ball, scorecard = names
+    for _ in range(balls):
+        event = rng.choice(EVENTS)
+        body = {'striker_id': match['batters'][0], 'non_striker_id': match['batters'][1],
+                'bowler_id': match['bowlers'][match['over_no'] % 2], 'event': event}
+        yield 'POST', reverse(update_ball, args=[match['match_id'], match['over_id']]), body
+        match['legal'] += event[:2] not in ('NB', 'WD')
+        if match['legal'] == 6:
+            match['over_no'] += 1
+            response = yield 'POST', reverse(update_ball, args=[match['match_id'], match['over_id']]), {
+                **body, 'event': 'OVER', 'new_bowler_id': match['bowlers'][match['over_no'] % 2],
+            }
+            match['over_id'], match['legal'] = response['new_over_id'], 0
+            yield 'GET', reverse(scorecard, args=[match['match_id']]), None
+
+
+def start_matches(league, count, first_number):
+    """``count`` live matches spread over the league's owners, each with its own logged-in session."""
+    from django.conf import settings
+    from django.test import Client
+    from django.utils.crypto import get_random_string
+
+    from benchmarks.run import start_match
+
+    owners = list(league.items())
+    matches = []
+    for number in range(count):
+        owner, teams = owners[number % len(owners)]
+        client = Client()
+        client.force_login(owner)
+        match = start_match(client, teams, first_number + number)
+        token = get_random_string(32)
+        match['headers'] = {
+            'cookie': f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; '
+                      f'{settings.CSRF_COOKIE_NAME}={token}',
+            'x-csrftoken': token,
+        }
+        matches.append(match)
+    return matches
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies, self.queries, self.errors = [], [], 0
+        self.lock = threading.Lock()
+
+    def add(self, started, status, queries):
+        with self.lock:
+            self.latencies.append((time.perf_counter() - started) * 1000)
+            self.queries.append(queries)
+            self.errors += status >= 400
+
+    def report(self, wall, balls):
+        summary = summarize(self.latencies, self.queries, wall)
+        summary['balls_per_second'] = round(balls / wall, 1)
+        summary['errors'] = self.errors
+        return summary
+
+
+def _queries(headers):
+    # RequestMetricsMiddleware's Server-Timing: db;dur=..;desc="N queries", ...
+    timing = headers.get('server-timing', '')
+    return int(timing.split('desc="')[1].split()[0]) if 'desc="' in timing else 0
+
+
+# -------------------------------
+# WSGI: a fixed pool of worker threads
+# -------------------------------
+def wsgi_request(handler, method, path, headers, body):
+    from django.test import RequestFactory
+
+    payload = json.dumps(body).encode() if body is not None else b''
+    environ = RequestFactory()._base_environ(
+        PATH_INFO=path, REQUEST_METHOD=method, CONTENT_TYPE='application/json',
+        CONTENT_LENGTH=str(len(payload)), **{'wsgi.input': io.BytesIO(payload)},
+        **{f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers.items()},
+    )
+    result = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        result['status'] = int(status.split()[0])
+        result['headers'] = {name.lower(): value for name, value in response_headers}
+
+    response = handler(environ, start_response)
+    try:
+        content = b''.join(response)
+    finally:
+        response.close()  # request_finished: closes or keeps the connection
+    return result['status'], result['headers'], content
+
+
+def run_wsgi(matches, balls, seed, threads):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    recorder = Recorder()
+    workers = ThreadPoolExecutor(max_workers=threads)
+
+    def score(index, match):
+        requests = scorer(match, balls, random.Random(seed + index), MODES['wsgi'])
+        response = None
+        try:
+            while True:
+                method, path, body = requests.send(response)
+                started = time.perf_counter()
+                status, headers, content = workers.submit(
+                    wsgi_request, handler, method, path, match['headers'], body).result()
+                recorder.add(started, status, _queries(headers))
+                response = json.loads(content) if status < 400 else {}
+        except StopIteration:
+            pass
+
+    started = time.perf_counter()
+    scorers = [threading.Thread(target=score, args=(index, match)) for index, match in enumerate(matches)]
+    for thread in scorers:
+        thread.start()
+    for thread in scorers:
+        thread.join()
+    wall = time.perf_counter() - started
+    workers.shutdown()
+    return recorder.report(wall, balls * len(matches))
+
+
+# -------------------------------
+# ASGI: one event loop
+# -------------------------------
+async def asgi_request(application, method, path, headers, body):
+    payload = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode())]
+                   + [(name.encode(), value.encode()) for name, value in headers.items()],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    received = asyncio.Event()
+    result = {'body': []}
+
+    async def receive():
+        if not received.is_set():
+            received.set()
+            return {'type': 'http.request', 'body': payload, 'more_body': False}
+        await asyncio.Future()  # the client never disconnects; Django cancels this wait
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+            result['headers'] = {name.decode().lower(): value.decode() for name, value in message['headers']}
+        elif message['type'] == 'http.response.body':
+            result['body'].append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    return result['status'], result['headers'], b''.join(result['body'])
+
+
+def run_asgi(matches, balls, seed):
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+    recorder = Recorder()
+
+    async def score(index, match):
+        requests = scorer(match, balls, random.Random(seed + index), MODES['asgi'])
+        response = None
+        try:
+            while True:
+                method, path, body = requests.send(response)
+                started = time.perf_counter()
+                status, headers, content = await asgi_request(application, method, path, match['headers'], body)
+                recorder.add(started, status, _queries(headers))
+                response = json.loads(content) if status < 400 else {}
+        except StopIteration:
+            pass
+
+    async def score_all():
+        await asyncio.gather(*(score(index, match) for index, match in enumerate(matches)))
+
+    started = time.perf_counter()
+    asyncio.run(score_all())
+    return recorder.report(time.perf_counter() - started, balls * len(matches))
+
+
+# -------------------------------
+# Entry point
+# -------------------------------
+def add_latency(seconds):
+    """Sleep ``seconds`` before every statement outside a transaction, on every connection opened from now on."""
+    from django.db.backends.signals import connection_created
+
+    def wait(execute, sql, params, many, context):
+        if not context['connection'].in_atomic_block:
+            time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if wait not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, wait)
+
+    connection_created.connect(install, weak=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--matches', type=int, default=32, help="Matches scored at the same time.")
+    parser.add_argument('--balls', type=int, default=36, help="Deliveries per match.")
+    parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads.")
+    parser.add_argument('--db-latency-ms', type=float, default=2.0,
+                        help="Added to each statement outside a transaction, standing in for the Oracle round trip.")
+    parser.add_argument('--mode', choices=sorted(MODES), action='append', help="Run only these modes.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connections
+
+    database = settings.DATABASES['default']
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        if os.path.exists(database['NAME']):
+            os.remove(database['NAME'])
+        # concurrent writers wait for the lock instead of failing; WAL lets readers carry on meanwhile
+        database['OPTIONS'].update(timeout=60, transaction_mode='IMMEDIATE',
+                                   init_command='PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL')
+    call_command('migrate', verbosity=0)
+
+    from benchmarks.league import seed_league
+
+    league = seed_league(users=4, history_matches=2, seed=args.seed)
+    report = {'config': vars(args), 'engine': database['ENGINE'], 'modes': {}}
+    original = dict(database)
+    if args.db_latency_ms:
+        add_latency(args.db_latency_ms / 1000)
+    for number, mode in enumerate(args.mode or sorted(MODES, reverse=True)):
+        matches = start_matches(league, args.matches, 20_000 + number * args.matches)
+        connections.close_all()
+        if mode == 'asgi':
+            # each ASGI request runs its sync work on a fresh thread, so a persistent
+            # connection would never be reused; ASGI deployments pool or close instead
+            database['CONN_MAX_AGE'] = 0
+        if mode == 'wsgi':
+            report['modes'][mode] = run_wsgi(matches, args.balls, args.seed, args.threads)
+        else:
+            report['modes'][mode] = run_asgi(matches, args.balls, args.seed)
+        connections.close_all()
+        database.update(original)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Measure what opening a database connection costs each request.
+
+    python -m benchmarks.connections --requests 500 --output connections.json
+
+Requests go through the real WSGI handler (not the test client, which keeps
+connections open across requests), against /healthz/, so almost all of
+the time is spent getting a connection. Each reuse mode is timed in turn:
+
+    none        CONN_MAX_AGE=0, a new connection per request
+    persistent  CONN_MAX_AGE from cricket.database, health checked on reuse
+    pool        the driver pool, only where the backend has one
+
+Point DJANGO_SETTINGS_MODULE at cricket.settings.select to measure Oracle itself.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.run import percentile
+
+
+def run_mode(handler, environ, requests):
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    opened = []
+    count = lambda sender, connection, **kwargs: opened.append(connection.alias)  # noqa: E731
+    connection_created.connect(count)
+    latencies = []
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = handler(dict(environ), lambda status, headers, exc_info=None: None)
+            b''.join(response)
+            response.close()  # fires request_finished, which closes or keeps the connection
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        connection_created.disconnect(count)
+        connections.close_all()
+    ordered = sorted(latencies)
+    return {
+        'requests': requests,
+        'latency_ms': {
+            'p50': round(percentile(ordered, 0.50), 3),
+            'p95': round(percentile(ordered, 0.95), 3),
+            'p99': round(percentile(ordered, 0.99), 3),
+        },
+        'connects_per_request': round(len(opened) / requests, 3),
+    }
+
+
+def modes(database):
+    """(name, settings overrides) for every reuse mode ``database`` supports."""
+    from cricket.database import POOLS, env_int
+
+    options = {key: value for key, value in database.get('OPTIONS', {}).items() if key != 'pool'}
+    yield 'none', {'CONN_MAX_AGE': 0, 'OPTIONS': options}
+    yield 'persistent', {'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', 60), 'CONN_HEALTH_CHECKS': True,
+                         'OPTIONS': options}
+    if database['ENGINE'] in POOLS:
+        yield 'pool', {'CONN_MAX_AGE': 0, 'OPTIONS': dict(options, pool=POOLS[database['ENGINE']]())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help="Requests per mode.")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from django.test import RequestFactory
+
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(PATH_INFO='/healthz/', REQUEST_METHOD='GET')
+    connection = connections['default']
+    original = dict(connection.settings_dict)
+    report = {'config': vars(args), 'engine': original['ENGINE'], 'modes': {}}
+    try:
+        for name, overrides in modes(original):
+            connections.close_all()
+            connection.settings_dict.update(overrides)
+            run_mode(handler, environ, 5)  # warm-up: imports, URL resolver, pool creation
+            report['modes'][name] = run_mode(handler, environ, args.requests)
+            if name == 'pool':
+                connection.close_pool()
+    finally:
+        connection.settings_dict.clear()
+        connection.settings_dict.update(original)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
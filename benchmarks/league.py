@@ -0,0 +1,71 @@
+# benchmarks/league.py
+import random
+
+from django.contrib.auth.models import User
+
+from score.career import fold_completed_matches
+from score.models import Match, Over, Player, PlayerMatchStats, Team
+
+# -------------------------------
+# Synthetic league
+# -------------------------------
+# Deterministic for a given seed: owners with their own teams and players,
+# plus a history of completed matches so the list views, scorecards and
+# leaderboards have volume behind them.
+
+
+def seed_league(users=5, teams_per_user=4, players_per_team=11, history_matches=20, seed=42):
+    """Create the league and return ``{owner: [team, ...]}``."""
+    rng = random.Random(seed)
+    league = {}
+    for number in range(users):
+        owner = User.objects.create_user(f'bench{number}', password='bench')
+        players = Player.objects.bulk_create([
+            Player(user=owner, name=f'Player {number}-{index}')
+            for index in range(teams_per_user * players_per_team)
+        ])
+        teams = Team.objects.bulk_create([
+            Team(user=owner, name=f'Team {number}-{index}') for index in range(teams_per_user)
+        ])
+        Team.players.through.objects.bulk_create([
+            Team.players.through(team_id=team.pk, player_id=player.pk)
+            for index, team in enumerate(teams)
+            for player in players[index * players_per_team:(index + 1) * players_per_team]
+        ])
+        _seed_history(owner, teams, players_per_team, history_matches, rng)
+        league[owner] = teams
+    fold_completed_matches()
+    return league
+
+
+def _seed_history(owner, teams, players_per_team, count, rng):
+    squads = {team.pk: list(team.players.values_list('pk', flat=True)) for team in teams}
+    matches = Match.objects.bulk_create([
+        Match(user=owner, match_number=index + 1, team1=home, team2=away, total_overs=2, completed=True,
+              team1_runs=rng.randint(20, 60), team2_runs=rng.randint(20, 60))
+        for index, (home, away) in enumerate(rng.sample(teams, 2) for _ in range(count))
+    ])
+    overs, stats = [], []
+    for match in matches:
+        for batting, bowling in ((match.team1_id, match.team2_id), (match.team2_id, match.team1_id)):
+            bowlers = rng.sample(squads[bowling], 2)
+            overs += [
+                Over(user=owner, match_no=match, bowling_team_id=bowling, over_no=over_no, bowler_id=bowler,
+                     runs=rng.randint(0, 20), wickets=rng.randint(0, 2))
+                for over_no, bowler in enumerate(bowlers, start=1)
+            ]
+            for player_id in squads[batting][:players_per_team]:
+                balls = rng.randint(0, 12)
+                stats.append(PlayerMatchStats(user=owner, match=match, player_id=player_id,
+                                              runs=rng.randint(0, 2 * balls), balls=balls))
+            for player_id in bowlers:
+                stats.append(PlayerMatchStats(user=owner, match=match, player_id=player_id, wickets=rng.randint(0, 2),
+                                              overs_bowled=1.0, bowling_runs=rng.randint(0, 20)))
+    Over.objects.bulk_create(overs)
+    # A bowler who also batted gets both lines on one row
+    merged = {}
+    for row in stats:
+        line = merged.setdefault((row.match.pk, row.player_id), row)
+        if line is not row:
+            line.wickets, line.overs_bowled, line.bowling_runs = row.wickets, row.overs_bowled, row.bowling_runs
+    PlayerMatchStats.objects.bulk_create(merged.values())
@@ -0,0 +1,194 @@
+"""Benchmark the ball-scoring hot path and the list views on a synthetic league.
+
+    python -m benchmarks.run --balls 2000 --output after.json
+    python -m benchmarks.compare before.json after.json
+
+Everything goes through the Django test client on a fresh SQLite database
+(benchmarks.settings), so two runs with the same arguments replay exactly
+the same requests and can be compared across commits.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+EVENTS = ['0', '0', '1', '1', '1', '2', '3', '4', '4', '6', 'W', 'NB+1', 'WD+0']
+
+
+def percentile(sorted_values, fraction):
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, queries, wall_time):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / wall_time, 1) if wall_time else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(ordered), 3),
+            'p50': round(percentile(ordered, 0.50), 3),
+            'p95': round(percentile(ordered, 0.95), 3),
+            'p99': round(percentile(ordered, 0.99), 3),
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+class Timed:
+    """Runs requests through a test client, recording latency and query count of each."""
+
+    def __init__(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client = client
+        self.capture = lambda: CaptureQueriesContext(connection)
+        self.latencies, self.queries = [], []
+
+    def request(self, method, url, **kwargs):
+        from django.db import reset_queries
+
+        reset_queries()  # the log is capped at 9000 entries; once full, the count stays 0
+        with self.capture() as captured:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(url, **kwargs)
+            self.latencies.append((time.perf_counter() - started) * 1000)
+        self.queries.append(len(captured))
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+        return response
+
+
+# -------------------------------
+# Scenarios
+# -------------------------------
+def start_match(client, owner_teams, number):
+    """Create a match and its first over over HTTP, the way the scoring UI does."""
+    from django.urls import resolve
+    from score.models import Match
+
+    home, away = owner_teams[:2]
+    client.post('/matches/add/', {'match_number': number, 'team1': home.pk, 'team2': away.pk, 'total_overs': 50})
+    match = Match.objects.filter(team1=home, team2=away).latest('pk')
+    client.post(f'/match/{match.pk}/toss/', {'toss_winner': home.pk, 'decision': 'bat'})
+    batters = list(home.players.values_list('pk', flat=True))
+    bowlers = list(away.players.values_list('pk', flat=True))
+    response = client.post(f'/over/create/{match.pk}/', {
+        'striker': batters[0], 'non_striker': batters[1], 'bowler': bowlers[0],
+    })
+    over_id = resolve(response.url).kwargs['over_id']
+    return {'match_id': match.pk, 'over_id': over_id, 'batters': batters, 'bowlers': bowlers,
+            'legal': 0, 'over_no': 1}
+
+
+def replay_balls(league, balls, rng):
+    """POST ``balls`` deliveries round-robin across one live match per owner.
+
+    Returns the summary and the id of the first live match.
+    """
+    from django.test import Client
+
+    live = []
+    for number, (owner, teams) in enumerate(league.items()):
+        client = Client()
+        client.force_login(owner)
+        live.append((Timed(client), start_match(client, teams, 10_000 + number)))
+
+    started = time.perf_counter()
+    for index in range(balls):
+        timed, match = live[index % len(live)]
+        event = rng.choice(EVENTS)
+        body = {'striker_id': match['batters'][0], 'non_striker_id': match['batters'][1],
+                'bowler_id': match['bowlers'][match['over_no'] % 2], 'event': event}
+        timed.request('post', f"/update_ball/{match['match_id']}/{match['over_id']}/",
+                      data=json.dumps(body), content_type='application/json')
+        match['legal'] += event[:2] not in ('NB', 'WD')
+        if match['legal'] == 6:
+            match['over_no'] += 1
+            response = timed.request('post', f"/update_ball/{match['match_id']}/{match['over_id']}/", data=json.dumps({
+                **body, 'event': 'OVER', 'new_bowler_id': match['bowlers'][match['over_no'] % 2], 'over_summary': '',
+            }), content_type='application/json')
+            match['over_id'], match['legal'] = response.json()['new_over_id'], 0
+    wall = time.perf_counter() - started
+    summary = summarize(
+        [ms for timed, _ in live for ms in timed.latencies],
+        [count for timed, _ in live for count in timed.queries],
+        wall,
+    )
+    return summary, live[0][1]['match_id']
+
+
+def time_pages(league, url, repeat):
+    from django.test import Client
+
+    owner = next(iter(league))
+    client = Client()
+    client.force_login(owner)
+    timed = Timed(client)
+    timed.request('get', url)  # warm-up
+    timed.latencies, timed.queries = [], []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        timed.request('get', url)
+    return summarize(timed.latencies, timed.queries, time.perf_counter() - started)
+
+
+# -------------------------------
+# Entry point
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--teams', type=int, default=4, help="Teams per user.")
+    parser.add_argument('--players', type=int, default=11, help="Players per team.")
+    parser.add_argument('--history', type=int, default=20, help="Completed matches per user.")
+    parser.add_argument('--balls', type=int, default=2000, help="update_ball POSTs to replay.")
+    parser.add_argument('--page-repeat', type=int, default=100, help="GETs per list view.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    from django.core.management import call_command
+
+    database = settings.DATABASES['default']['NAME']
+    if database != ':memory:' and os.path.exists(database):
+        os.remove(database)
+    call_command('migrate', verbosity=0)
+
+    from benchmarks.league import seed_league
+
+    started = time.perf_counter()
+    league = seed_league(args.users, args.teams, args.players, args.history, args.seed)
+    seed_seconds = round(time.perf_counter() - started, 2)
+    update_ball, match_id = replay_balls(league, args.balls, random.Random(args.seed))
+    report = {'config': vars(args), 'seed_seconds': seed_seconds, 'scenarios': {'update_ball': update_ball}}
+    for name, url in (
+        ('scorecard', f'/match/{match_id}/scorecard/'),
+        ('player_list', '/players/'),
+        ('team_list', '/teams/'),
+        ('match_list', '/matches/'),
+        ('leaderboard', '/leaderboard/?metric=runs'),
+    ):
+        report['scenarios'][name] = time_pages(league, url, args.page_repeat)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+# benchmarks/settings.py
+import os
+import tempfile
+
+from cricket.database import with_connection_reuse
+from cricket.settings.test import *  # noqa: F401,F403
+
+# The test profile, on a throwaway SQLite file the benchmark can reopen.
+DATABASES = {
+    'default': with_connection_reuse({
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCH_DB', os.path.join(tempfile.gettempdir(), 'cricket-bench.sqlite3')),
+    }),
+}
+REQUEST_BUDGETS_ENFORCE = False
@@ -5,12 +5,17 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live scoreboard stream (score.views.LiveScoreStreamView) is an async
+Server-Sent Events view, so serve it from here, e.g.
+``uvicorn cricket.asgi:application``. Scorers on this deployment should post
+to the async variants of update_ball and the scorecard (``/async/...``).
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cricket.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cricket.settings.select')
 
 application = get_asgi_application()
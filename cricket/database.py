@@ -0,0 +1,70 @@
+# cricket/database.py
+import os
+
+# -------------------------------
+# Connection reuse for DATABASES
+# -------------------------------
+# Opening an Oracle session costs more than a whole update_ball, so no
+# request should pay for one. On Oracle and PostgreSQL connections come from
+# a driver-level pool (python-oracledb / psycopg_pool); on other backends, or
+# with DB_POOL=0, each worker keeps a persistent connection that is health
+# checked before reuse. Everything is tunable from the environment.
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_flag(name, default):
+    return os.environ.get(name, '1' if default else '0').lower() in ('1', 'true', 'yes', 'on')
+
+
+def _oracle_pool():
+    options = {
+        'min': env_int('DB_POOL_MIN', 2),
+        'max': env_int('DB_POOL_MAX', 20),
+        'increment': env_int('DB_POOL_INCREMENT', 2),
+        'timeout': env_int('DB_POOL_IDLE_TIMEOUT', 300),  # seconds before idle sessions close
+        'ping_interval': env_int('DB_POOL_PING_INTERVAL', 60),  # idle this long => pinged on acquire
+        'wait_timeout': env_int('DB_POOL_WAIT_MS', 5000),
+    }
+    try:
+        import oracledb
+    except ImportError:  # the backend reports the missing driver itself
+        return options
+    # Fail after wait_timeout instead of queueing forever when the pool is exhausted
+    options['getmode'] = oracledb.POOL_GETMODE_TIMEDWAIT
+    return options
+
+
+def _postgresql_pool():
+    return {
+        'min_size': env_int('DB_POOL_MIN', 2),
+        'max_size': env_int('DB_POOL_MAX', 20),
+        'max_idle': env_int('DB_POOL_IDLE_TIMEOUT', 300),
+        'timeout': env_int('DB_POOL_WAIT_MS', 5000) / 1000,
+    }
+
+
+POOLS = {
+    'django.db.backends.oracle': _oracle_pool,
+    'django.db.backends.postgresql': _postgresql_pool,
+}
+
+
+def with_connection_reuse(database):
+    """A copy of the DATABASES entry ``database`` set up to reuse connections.
+
+    DB_POOL (default on) picks the driver pool where the backend has one;
+    otherwise connections persist for DB_CONN_MAX_AGE seconds (default 60).
+    Pools manage their own lifetimes, so CONN_MAX_AGE stays 0 with them.
+    """
+    database = dict(database, OPTIONS=dict(database.get('OPTIONS', {})))
+    pool = POOLS.get(database['ENGINE'])
+    if pool and env_flag('DB_POOL', True):
+        database['OPTIONS']['pool'] = pool()
+        database['CONN_MAX_AGE'] = 0
+    else:
+        database['CONN_MAX_AGE'] = env_int('DB_CONN_MAX_AGE', 60)
+        database['CONN_HEALTH_CHECKS'] = True
+    return database
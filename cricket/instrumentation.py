@@ -0,0 +1,232 @@
+# cricket/instrumentation.py
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Per-request measurements
+# -------------------------------
+class RequestMetrics:
+    """Query count, DB time, slowest statement and wall time of one request.
+
+    Installed as a database execute wrapper, so it sees every statement the
+    request runs, including the session and auth lookups.
+    """
+
+    def __init__(self):
+        self.url_name = None
+        self.budget = None  # REQUEST_BUDGETS entry: the URL name, or "<url name>:<case>"
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest_sql = None
+        self.slowest_time = 0.0
+        self.view_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if elapsed >= self.slowest_time:
+                self.slowest_time, self.slowest_sql = elapsed, sql
+
+    @property
+    def db_ms(self):
+        return self.db_time * 1000
+
+    @property
+    def view_ms(self):
+        return self.view_time * 1000
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+            f'app;dur={self.view_ms - self.db_ms:.1f}, '
+            f'total;dur={self.view_ms:.1f}'
+        )
+
+
+# -------------------------------
+# In-process aggregation
+# -------------------------------
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class MetricsRegistry:
+    """The last ``window`` requests per URL name, summarised on demand.
+
+    Each worker process keeps its own registry; nothing leaves the process.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._slowest = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        with self._lock:
+            self._samples[metrics.url_name].append((metrics.view_ms, metrics.queries, metrics.db_ms))
+            slowest = self._slowest.get(metrics.url_name)
+            if metrics.slowest_sql and (slowest is None or metrics.slowest_time * 1000 >= slowest['ms']):
+                self._slowest[metrics.url_name] = {'ms': round(metrics.slowest_time * 1000, 2),
+                                                   'sql': metrics.slowest_sql}
+
+    def summary(self, url_name):
+        with self._lock:
+            samples = list(self._samples.get(url_name, ()))
+            slowest = self._slowest.get(url_name)
+        if not samples:
+            return None
+        result = {'requests': len(samples), 'slowest_sql': slowest}
+        for position, label in enumerate(('view_ms', 'queries', 'db_ms')):
+            values = sorted(sample[position] for sample in samples)
+            result[label] = {
+                f'p{int(fraction * 100)}': round(percentile(values, fraction), 2)
+                for fraction in (0.5, 0.95, 0.99)
+            }
+        return result
+
+    def summaries(self):
+        with self._lock:
+            names = list(self._samples)
+        return {name: self.summary(name) for name in sorted(names)}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._slowest.clear()
+
+
+registry = MetricsRegistry()
+
+
+# -------------------------------
+# Budgets
+# -------------------------------
+class BudgetExceeded(AssertionError):
+    """A view ran more queries (or took longer) than its REQUEST_BUDGETS entry allows."""
+
+
+def budget_case(request, case):
+    """Hold ``request`` to REQUEST_BUDGETS["<url name>:<case>"] instead of the view's own entry.
+
+    For the rarer, dearer paths of a view (a wicket, a player's first ball),
+    so the common path keeps a tight budget. ``None`` leaves the view's own.
+    """
+    request.budget_case = case
+
+
+def check_budget(metrics):
+    budgets = getattr(settings, 'REQUEST_BUDGETS', {})
+    if metrics.budget not in budgets:
+        metrics.budget = metrics.url_name
+    budget = budgets.get(metrics.budget)
+    if not budget:
+        return
+    over = []
+    if 'queries' in budget and metrics.queries > budget['queries']:
+        over.append(f"{metrics.queries} queries (budget {budget['queries']})")
+    if 'view_ms' in budget and metrics.view_ms > budget['view_ms']:
+        over.append(f"{metrics.view_ms:.1f} ms (budget {budget['view_ms']} ms)")
+    if not over:
+        return
+    message = f"{metrics.budget} over budget: {', '.join(over)}; slowest SQL: {metrics.slowest_sql}"
+    if getattr(settings, 'REQUEST_BUDGETS_ENFORCE', False):
+        raise BudgetExceeded(message)
+    logger.warning(message)
+
+
+# -------------------------------
+# Middleware and report view
+# -------------------------------
+class RequestMetricsMiddleware:
+    """Measure every request, add a Server-Timing header and check the view's budget.
+
+    Keep it first in MIDDLEWARE so the session and auth queries are counted too.
+    Under ASGI it runs async, so async views are not pushed onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            _measure(stack, metrics)
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        stack = ExitStack()
+        # Connections are per thread and the async ORM queries from the request's
+        # sync thread, so the wrapper goes onto that thread's connections
+        await sync_to_async(_measure)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        metrics.view_time = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.url_name = match.url_name if match else None
+        case = getattr(request, 'budget_case', None)
+        metrics.budget = f'{metrics.url_name}:{case}' if case else metrics.url_name
+        response.metrics = metrics
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = metrics.server_timing()
+        if metrics.url_name:
+            registry.record(metrics)
+            check_budget(metrics)
+        return response
+
+
+def _measure(stack, metrics):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+
+
+def database_health(request):
+    """Load-balancer probe: 200 when the default database answers, 503 when it does not."""
+    connection = connections['default']
+    try:
+        connection.ensure_connection()
+        healthy = connection.is_usable()
+    except Exception:  # any driver error means unhealthy
+        healthy = False
+    return JsonResponse({'database': 'ok' if healthy else 'unavailable'}, status=200 if healthy else 503)
+
+
+@staff_member_required
+def request_metrics(request):
+    """JSON percentiles per URL name for this worker process."""
+    return JsonResponse(registry.summaries())
@@ -0,0 +1,7 @@
+# cricket/settings/__init__.py
+"""Settings profiles: base (shared), dev, test and production.
+
+Importing this package loads none of them; cricket.settings.select picks one
+from CRICKET_PROFILE, and DJANGO_SETTINGS_MODULE can name a profile module
+directly, e.g. ``cricket.settings.production``.
+"""
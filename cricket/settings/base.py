@@ -0,0 +1,198 @@
+"""
+Django settings for cricket project shared by every profile.
+
+Generated by 'django-admin startproject' using Django 5.2.1. The profile
+modules next to this one (dev, test, production) import it and add the
+database, debug, cache and session settings; cricket/settings/select.py
+picks one from the CRICKET_PROFILE environment variable.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+from pathlib import Path
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# SECRET_KEY, DEBUG, ALLOWED_HOSTS, DATABASES and CACHES come from the profile.
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+
+def required(name):
+    """The environment variable ``name``, for settings a profile must not default."""
+    try:
+        return os.environ[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Set the {name} environment variable")
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'score',
+    'access'
+]
+
+MIDDLEWARE = [
+    'cricket.instrumentation.RequestMetricsMiddleware',  # first, so it counts every query
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'cricket.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'cricket.wsgi.application'
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+LOGIN_REDIRECT_URL = "/home/"      # after login
+LOGOUT_REDIRECT_URL = "login"  # after logout
+# Development email backend
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Where sessions live (SESSION_STORE): db, cached_db, cache or signed_cookies.
+# Each save on the db engines is an UPDATE on django_session; cache and
+# signed_cookies never touch the database, and only the db engines need
+# `manage.py purge_sessions` run from cron to drop expired rows.
+SESSION_STORE = os.environ.get('SESSION_STORE') or 'cached_db'
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+# Seconds to keep permission checks in the cache framework across requests
+# (0 = cache for the current request only). Needs a shared cache backend when
+# running more than one worker process.
+ACCESS_PERMISSION_CACHE_TIMEOUT = 300
+
+# Seconds a date-range leaderboard stays cached; any match folded into the
+# career totals invalidates every board straight away.
+LEADERBOARD_CACHE_TIMEOUT = 60 * 15
+
+# Completed matches older than this many days move their overs and balls into
+# one MatchArchive row each (`manage.py archive_matches`, see score/archive.py).
+ARCHIVE_AFTER_DAYS = 365
+
+# Query/latency ceilings per URL name, checked by RequestMetricsMiddleware on
+# every request. Over budget is logged; with REQUEST_BUDGETS_ENFORCE on (the
+# test suite) it raises instead. A view can hold a rarer, dearer request to
+# "<url name>:<case>" (cricket.instrumentation.budget_case).
+#
+# Each comment gives the target on Oracle, counting the auth lookup, and the
+# statements it stands for. The budget is that target plus what the test
+# database adds, and nothing else, so any other extra query fails the suite:
+#   sqlite  +2: run_updates() sends SQLite the over, stats and match UPDATEs
+#           one by one; Oracle gets them as one PL/SQL block
+#   atomic  +2 per atomic() block: inside the TestCase transaction each one is a
+#           SAVEPOINT/RELEASE pair
+REQUEST_BUDGETS = {
+    # 4: auth, over, ball INSERT, UPDATEs; +2 sqlite, +2 atomic
+    'update_ball': {'queries': 8},
+    # 6: update_ball + innings state locked and updated; +2 sqlite, +2 atomic
+    'update_ball:wicket': {'queries': 10},
+    # 5: update_ball + stats rows INSERT; +2 sqlite, +2 atomic. Oracle can't
+    # skip existing rows in an INSERT, so there it is 8: lookup and a savepoint
+    'update_ball:first_ball': {'queries': 9},
+    # 7 (10 on Oracle): both of the above; +2 sqlite, +2 atomic
+    'update_ball:first_wicket': {'queries': 11},
+    # 8: auth, over, new bowler, summary UPDATE, next over SELECT and INSERT,
+    # state SELECT and UPDATE; +4 atomic (the next over and the state)
+    'update_ball:over': {'queries': 12},
+    # 5: update_ball + the lookup of sequences already stored; +2 sqlite, +2 atomic
+    'update_balls': {'queries': 9},
+    'update_balls:wicket': {'queries': 11},  # 7; as update_ball:wicket
+    'update_balls:first_ball': {'queries': 10},  # 6 (9 on Oracle); as update_ball:first_ball
+    'update_balls:first_wicket': {'queries': 12},  # 8 (11 on Oracle); as update_ball:first_wicket
+    # 10 with a cold card: auth, match, players, over, the card's rebuild (match,
+    # rosters, balls), bowlers, remaining and dismissed batters
+    'over_score': {'queries': 10},
+    'scorecard': {'queries': 5},  # cold card: auth, match, the rebuild
+    'async_update_ball': {'queries': 8},
+    'async_update_ball:wicket': {'queries': 10},
+    'async_update_ball:first_ball': {'queries': 9},
+    'async_update_ball:first_wicket': {'queries': 11},
+    'async_update_ball:over': {'queries': 12},
+    'async_scorecard': {'queries': 5},
+    'live_score': {'queries': 2},  # auth, match; the card comes from the cache
+    'player_list': {'queries': 2},
+    'team_list': {'queries': 3},  # + rosters, prefetched
+    'match_list': {'queries': 2},
+    'leaderboard': {'queries': 3},  # + the team filter's choices
+    'request_match_access': {'queries': 4},  # auth, match, pending request check, INSERT
+}
+REQUEST_BUDGETS_ENFORCE = False
+REQUEST_METRICS_SERVER_TIMING = True
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'Asia/Kolkata'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+STATICFILES_DIRS = [
+    os.path.join(BASE_DIR, 'static'),
+]
+STATIC_ROOT = os.path.join(BASE_DIR, 'assets')
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
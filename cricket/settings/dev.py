@@ -0,0 +1,33 @@
+# cricket/settings/dev.py
+"""Local development: debug on, the Oracle XE instance, per-process caches.
+
+DB_USER and DB_PASSWORD must be set; DB_NAME defaults to the local XE service.
+"""
+import os
+
+from cricket.database import with_connection_reuse
+
+from .base import *  # noqa: F401,F403
+from .base import required
+
+# SECURITY WARNING: development only, production reads SECRET_KEY from the environment
+SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-48&$8cc3=w25_7!+hry^y^ot@$ytuyx3hdr$ug677&9y@%ado2')
+
+# Debug keeps every SQL statement of a request in memory; fine for one developer
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+DATABASES = {
+    # pooled sessions (see cricket/database.py for the DB_POOL_* knobs)
+    'default': with_connection_reuse({
+        'ENGINE': 'django.db.backends.oracle',
+        'NAME': os.environ.get('DB_NAME', 'localhost:1521/XEPDB1'),  # e.g. 'localhost:1521/orclpdb1'
+        'USER': required('DB_USER'),
+        'PASSWORD': required('DB_PASSWORD'),
+    }),
+}
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
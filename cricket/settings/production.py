@@ -0,0 +1,53 @@
+# cricket/settings/production.py
+"""Deployment: everything secret or host-specific comes from the environment.
+
+Debug is off, so no request accumulates its SQL in connection.queries;
+templates are compiled once per process; the cache is shared across
+workers and sessions live in it instead of the django_session table.
+"""
+import os
+
+from cricket.database import with_connection_reuse
+
+from .base import *  # noqa: F401,F403
+from .base import required
+
+
+SECRET_KEY = required('SECRET_KEY')
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
+
+DATABASES = {
+    'default': with_connection_reuse({
+        'ENGINE': 'django.db.backends.oracle',
+        'NAME': required('DB_NAME'),
+        'USER': required('DB_USER'),
+        'PASSWORD': required('DB_PASSWORD'),
+    }),
+}
+
+# Compile each template once per process instead of on every render
+TEMPLATES = [dict(TEMPLATES[0], APP_DIRS=False, OPTIONS=dict(TEMPLATES[0]['OPTIONS'], loaders=[
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]))]
+
+# Shared by every worker, so permission checks, scorecards and leaderboards
+# are cached once for the whole site
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'TIMEOUT': 300,
+    },
+}
+
+SESSION_STORE = os.environ.get('SESSION_STORE') or 'cache'
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
@@ -0,0 +1,21 @@
+# cricket/settings/select.py
+"""Pick the settings profile named by CRICKET_PROFILE: dev (default), test or production.
+
+manage.py, wsgi.py and asgi.py point DJANGO_SETTINGS_MODULE here. ``manage.py
+test`` and ``makemigrations`` default to the test profile, which needs no
+database credentials.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+PROFILE = os.environ.get('CRICKET_PROFILE', 'dev')
+
+if PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif PROFILE == 'test':
+    from .test import *  # noqa: F401,F403
+elif PROFILE == 'production':
+    from .production import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"CRICKET_PROFILE must be dev, test or production, not {PROFILE!r}")
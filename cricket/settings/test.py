@@ -0,0 +1,25 @@
+# cricket/settings/test.py
+"""The test suite and benchmarks: SQLite in memory, fast hashing, no Oracle needed."""
+from .base import *  # noqa: F401,F403
+
+SECRET_KEY = 'test-only-not-secret'
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+# Salted MD5 is unsafe for real passwords, and hundreds of times faster than PBKDF2
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
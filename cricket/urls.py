@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path ,include
 from django.contrib.auth import views as auth_views
+from cricket.instrumentation import database_health, request_metrics
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/requests/', request_metrics, name='request_metrics'),  # staff only
+    path('healthz/', database_health, name='database_health'),
     path('',include('score.urls')),
     path('access/',include('access.urls')),
      # Forgot Password URLs
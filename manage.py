@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cricket.settings')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cricket.settings.select')
+    if sys.argv[1:2] in (['test'], ['makemigrations']):  # neither needs the real database
+        os.environ.setdefault('CRICKET_PROFILE', 'test')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -1,9 +1,27 @@
 from django.contrib import admin
-from score.models import Player, Team, Match, Over, PlayerMatchStats
+from score.models import Player, Team, Match, Over, PlayerMatchStats, Ball, InningsState
+
+# Every list page declares the rows it joins up front, so rendering a row
+# (including Match.__str__, which shows both team names) never queries again.
+MATCH_TEAMS = ('team1', 'team2')
+
+
+def via(prefix, *fields):
+    return tuple(f'{prefix}__{field}' for field in fields)
+
+
+class MatchListFilter(admin.RelatedFieldListFilter):
+    """Match filter whose choices are labelled without a team query per match."""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or ('-date', '-match_number')
+        matches = Match.objects.select_related(*MATCH_TEAMS).order_by(*ordering)
+        return [(match.pk, str(match)) for match in matches]
 
 # Player
 class PlayerAdmin(admin.ModelAdmin):
-    list_display = ('name', 'total_runs', 'total_wickets', 'total_matches')
+    list_display = ('name', 'total_runs', 'total_wickets', 'total_matches', 'strike_rate',
+                    'batting_average', 'economy', 'best_bowling', 'highest_score')
     search_fields = ('name',)
 
 # Team
@@ -13,21 +31,36 @@ class TeamAdmin(admin.ModelAdmin):
 
 # Match
 class MatchAdmin(admin.ModelAdmin):
-    list_display = ('match_number', 'team1', 'team2', 'winners', 'date')
+    list_display = ('match_number', 'team1', 'team2', 'winners', 'date', 'completed', 'career_stats_applied')
+    list_select_related = MATCH_TEAMS
     search_fields = ('match_number','winners')
     list_filter = ('match_number', 'date')
 
 # Over
 class OverAdmin(admin.ModelAdmin):
     list_display = ('match_no', 'over_no', 'over_summary', 'bowler')
+    list_select_related = via('match_no', *MATCH_TEAMS) + ('bowler',)
     search_fields = ('over_no', 'bowler__name')  # use related field
     list_filter = ('over_no',)
 
 # Player Match Stats
 class PlayerMatchStatsAdmin(admin.ModelAdmin):
     list_display = ('match', 'player', 'runs', 'balls', 'wickets')
+    list_select_related = via('match', *MATCH_TEAMS) + ('player',)
     search_fields = ('match__match_number', 'player__name')  # use related field
-    list_filter = ('match', 'player')
+    list_filter = (('match', MatchListFilter), 'player')
+
+# Ball event log
+class BallAdmin(admin.ModelAdmin):
+    list_display = ('match', 'innings', 'over', 'ball_index', 'striker', 'bowler', 'event', 'runs', 'extras')
+    list_select_related = via('match', *MATCH_TEAMS) + ('over__bowler', 'striker', 'bowler')
+    list_filter = ('event', 'innings')
+    search_fields = ('match__match_number', 'striker__name', 'bowler__name')
+
+# Live match state
+class InningsStateAdmin(admin.ModelAdmin):
+    list_display = ('match', 'innings', 'batting_team', 'bowling_team', 'bowler', 'updated_at')
+    list_select_related = via('match', *MATCH_TEAMS) + ('batting_team', 'bowling_team', 'bowler')
 
 # Register models
 admin.site.register(Player, PlayerAdmin)
@@ -35,3 +68,5 @@ admin.site.register(Team, TeamAdmin)
 admin.site.register(Match, MatchAdmin)
 admin.site.register(Over, OverAdmin)
 admin.site.register(PlayerMatchStats, PlayerMatchStatsAdmin)
+admin.site.register(Ball, BallAdmin)
+admin.site.register(InningsState, InningsStateAdmin)
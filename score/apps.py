@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ScoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'score'
+
+    def ready(self):
+        from . import live, scorecard  # noqa: F401  (connects the balls_recorded receivers)
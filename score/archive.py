@@ -0,0 +1,168 @@
+# score/archive.py
+import datetime
+import json
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Ball, InningsState, Match, MatchArchive, Over, PlayerMatchStats
+from .scorecard import build_scorecard, invalidate_scorecard
+
+# -------------------------------
+# Archiving completed matches
+# -------------------------------
+# Only live matches are written to, yet Over and Ball (by far the largest
+# tables) keep every delivery ever bowled. Once a completed match is older
+# than ARCHIVE_AFTER_DAYS and folded into the careers, its overs, balls and
+# innings state move into a single MatchArchive row: zlib-compressed JSON
+# holding those rows column-wise plus the finished scorecard, which is what
+# the scorecard API serves for it from then on.
+#
+# The Match row stays, so lists, permissions and leaderboards are unchanged,
+# and so do the PlayerMatchStats lines the leaderboards and career rebuilds
+# aggregate; each line keeps its dismissals count in place of the ball log.
+ARCHIVE_FORMAT = 1
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _dump(queryset):
+    columns = _columns(queryset.model)
+    return {'columns': columns, 'rows': [list(row) for row in queryset.order_by('pk').values_list(*columns)]}
+
+
+def _load(model, table):
+    return [model(**dict(zip(table['columns'], row))) for row in table['rows']]
+
+
+def _isoformat(value):
+    # full precision; DjangoJSONEncoder would round delivery times to milliseconds
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def encode_archive(payload):
+    return zlib.compress(json.dumps(payload, default=_isoformat, separators=(',', ':')).encode(), 6)
+
+
+def decode_archive(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def _int_keys(mapping):
+    return {int(key): value for key, value in mapping.items()}
+
+
+def _thaw_scorecard(card):
+    """Undo JSON's string keys in an archived scorecard: sides and player ids are ints on a live card."""
+    card['players'] = _int_keys(card['players'])
+    card['sides'] = _int_keys(card['sides'])
+    for side in card['sides'].values():
+        side['batting'] = _int_keys(side['batting'])
+        side['bowling'] = _int_keys(side['bowling'])
+    return card
+
+
+def archive_cutoff(days=None):
+    days = getattr(settings, 'ARCHIVE_AFTER_DAYS', 365) if days is None else days
+    return timezone.localdate() - datetime.timedelta(days=days)
+
+
+def archivable_matches(days=None):
+    """Completed, career-folded matches played before the cutoff and not archived yet."""
+    return Match.objects.filter(
+        completed=True, career_stats_applied=True, archived=False, date__lt=archive_cutoff(days),
+    )
+
+
+@transaction.atomic
+def archive_match(match_id):
+    """Move one match's overs, balls and state into its MatchArchive row; False if not archivable."""
+    match = Match.objects.select_for_update().filter(
+        pk=match_id, completed=True, career_stats_applied=True, archived=False,
+    ).first()
+    if match is None:
+        return False
+
+    balls = Ball.objects.filter(match=match)
+    # the career rebuild counts dismissals from the ball log; keep them on the stat lines
+    dismissed = Counter(balls.filter(event='W', dismissed__isnull=False).values_list('dismissed_id', flat=True))
+    lines = list(PlayerMatchStats.objects.filter(match=match, player_id__in=dismissed))
+    for line in lines:
+        line.dismissals = dismissed.pop(line.player_id)
+
+    payload = {
+        'scorecard': build_scorecard(match.pk),
+        'overs': _dump(Over.objects.filter(match_no=match)),
+        'balls': _dump(balls),
+        'state': _dump(InningsState.objects.filter(match=match)),
+        # lines made below only to hold a dismissal; restore_match drops them again
+        'placeholders': list(dismissed),
+    }
+    MatchArchive.objects.create(match=match, version=ARCHIVE_FORMAT, data=encode_archive(payload))
+
+    PlayerMatchStats.objects.bulk_update(lines, ['dismissals'])
+    # run out at the non-striker's end without facing: no line yet, but it still counts
+    PlayerMatchStats.objects.bulk_create([
+        PlayerMatchStats(user_id=match.user_id, match=match, player_id=player_id, dismissals=count)
+        for player_id, count in dismissed.items()
+    ])
+
+    balls.delete()
+    Over.objects.filter(match_no=match).delete()
+    InningsState.objects.filter(match=match).delete()
+    match.archived = True
+    match.save(update_fields=['archived'])
+    transaction.on_commit(lambda: invalidate_scorecard(match.pk))
+    return True
+
+
+@transaction.atomic
+def restore_match(match_id):
+    """Put an archived match's rows back into the hot tables, with their original ids."""
+    match = Match.objects.select_for_update().filter(pk=match_id, archived=True).first()
+    if match is None:
+        return False
+    archive = MatchArchive.objects.get(match=match)
+    payload = decode_archive(archive.data)
+    Over.objects.bulk_create(_load(Over, payload['overs']))
+    balls = _load(Ball, payload['balls'])
+    bowled_at = [ball.created_at for ball in balls]
+    Ball.objects.bulk_create(balls)  # auto_now_add stamps them afresh...
+    for ball, created_at in zip(balls, bowled_at):
+        ball.created_at = created_at
+    Ball.objects.bulk_update(balls, ['created_at'], batch_size=500)  # ...so put the delivery times back
+    InningsState.objects.bulk_create(_load(InningsState, payload['state']))
+    # the ball log counts dismissals again, and a player with no line was never an appearance
+    PlayerMatchStats.objects.filter(match=match, player_id__in=payload.get('placeholders', [])).delete()
+    PlayerMatchStats.objects.filter(match=match).update(dismissals=0)
+    archive.delete()
+    match.archived = False
+    match.save(update_fields=['archived'])
+    transaction.on_commit(lambda: invalidate_scorecard(match.pk))
+    return True
+
+
+def archived_scorecard(match_id):
+    """The scorecard frozen when ``match_id`` was archived."""
+    data = MatchArchive.objects.filter(match_id=match_id).values_list('data', flat=True).get()
+    return _thaw_scorecard(decode_archive(data)['scorecard'])
+
+
+def archive_matches(days=None, limit=None, progress=None):
+    """Archive every archivable match (at most ``limit``), one transaction each; returns how many."""
+    pending = archivable_matches(days).order_by('date', 'pk').values_list('pk', flat=True)
+    if limit:
+        pending = pending[:limit]
+    done = 0
+    for match_id in list(pending):
+        done += archive_match(match_id)
+        if progress:
+            progress(done)
+    return done
@@ -0,0 +1,130 @@
+# score/career.py
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .leaderboard import invalidate_leaderboards
+from .models import Ball, Match, Player, PlayerMatchStats
+from .scoring import overs_to_balls
+
+CAREER_FIELDS = [
+    'total_matches', 'total_runs', 'total_balls', 'total_wickets', 'total_dismissals',
+    'total_balls_bowled', 'total_bowling_runs', 'highest_score',
+    'best_bowling_wickets', 'best_bowling_runs',
+]
+
+STAT_COLUMNS = ('match_id', 'player_id', 'runs', 'balls', 'wickets', 'overs_bowled', 'bowling_runs', 'dismissals')
+
+
+# -------------------------------
+# Folding one match into a career
+# -------------------------------
+def _match_lines(stat_rows, dismissals):
+    """Per (match, player) figures; duplicate stat rows for a pair are summed."""
+    lines = defaultdict(lambda: {'runs': 0, 'balls': 0, 'wickets': 0, 'legal': 0, 'bowling_runs': 0, 'out': 0})
+    for match_id, player_id, runs, balls, wickets, overs_bowled, bowling_runs, out in stat_rows:
+        line = lines[(match_id, player_id)]
+        line['out'] += out  # non-zero only once the match's ball log is archived (score.archive)
+        line['runs'] += runs
+        line['balls'] += balls
+        line['wickets'] += wickets
+        line['legal'] += overs_to_balls(overs_bowled)
+        line['bowling_runs'] += bowling_runs
+    for (match_id, player_id), count in dismissals.items():
+        # run out at the non-striker's end without facing still counts as playing
+        lines[(match_id, player_id)]['out'] += count
+    return lines
+
+
+def _fold_line(player, line):
+    player.total_matches += 1
+    player.total_runs += line['runs']
+    player.total_balls += line['balls']
+    player.total_wickets += line['wickets']
+    player.total_dismissals += line['out']
+    player.highest_score = max(player.highest_score, line['runs'])
+    if line['legal']:
+        figures = (line['wickets'], -line['bowling_runs'])
+        if not player.total_balls_bowled or figures > (player.best_bowling_wickets, -player.best_bowling_runs):
+            player.best_bowling_wickets, player.best_bowling_runs = line['wickets'], line['bowling_runs']
+        player.total_balls_bowled += line['legal']
+        player.total_bowling_runs += line['bowling_runs']
+
+
+@transaction.atomic
+def fold_match(match_id):
+    """Add a completed match to its players' career totals, exactly once.
+
+    The match row is locked and flagged in the same transaction, so a second
+    call (or a concurrent job) finds nothing to do. Returns the players updated.
+    """
+    match = Match.objects.select_for_update().filter(
+        pk=match_id, completed=True, career_stats_applied=False
+    ).first()
+    if match is None:
+        return 0
+
+    stat_rows = PlayerMatchStats.objects.filter(match=match).values_list(*STAT_COLUMNS)
+    dismissals = Counter(
+        Ball.objects.filter(match=match, event='W').values_list('match_id', 'dismissed_id')
+    )
+    lines = _match_lines(stat_rows, dismissals)
+    players = Player.objects.select_for_update().in_bulk({player_id for _, player_id in lines})
+    for (_, player_id), line in lines.items():
+        _fold_line(players[player_id], line)
+    Player.objects.bulk_update(players.values(), CAREER_FIELDS)
+
+    match.career_stats_applied = True
+    match.save(update_fields=['career_stats_applied'])
+    transaction.on_commit(invalidate_leaderboards)
+    return len(players)
+
+
+def fold_completed_matches():
+    """Incremental job: fold every completed match not yet in the career totals."""
+    pending = Match.objects.filter(completed=True, career_stats_applied=False).values_list('pk', flat=True)
+    return sum(fold_match(match_id) for match_id in list(pending))
+
+
+# -------------------------------
+# Full rebuild
+# -------------------------------
+def rebuild_career_stats(chunk_size=500, progress=None):
+    """Recompute every player's career totals from scratch, ``chunk_size`` players at a time.
+
+    Completed matches are flagged as applied up front, so the incremental job
+    leaves them alone; pause it while this runs so it cannot fold a newly
+    completed match into a chunk that is then overwritten.
+    """
+    Match.objects.filter(completed=True, career_stats_applied=False).update(career_stats_applied=True)
+    last_pk, done = 0, 0
+    while True:
+        with transaction.atomic():
+            players = list(
+                Player.objects.select_for_update().filter(pk__gt=last_pk).order_by('pk')[:chunk_size]
+            )
+            if not players:
+                break
+            ids = [player.pk for player in players]
+            stat_rows = PlayerMatchStats.objects.filter(
+                player_id__in=ids, match__career_stats_applied=True
+            ).values_list(*STAT_COLUMNS).iterator(chunk_size=2000)
+            dismissals = Counter(Ball.objects.filter(
+                dismissed_id__in=ids, event='W', match__career_stats_applied=True
+            ).values_list('match_id', 'dismissed_id').iterator(chunk_size=2000))
+            lines = _match_lines(stat_rows, dismissals)
+
+            by_pk = {player.pk: player for player in players}
+            for player in players:
+                for field in CAREER_FIELDS:
+                    setattr(player, field, 0)
+            for (_, player_id), line in sorted(lines.items()):
+                _fold_line(by_pk[player_id], line)
+            Player.objects.bulk_update(players, CAREER_FIELDS)
+
+        last_pk = players[-1].pk
+        done += len(players)
+        if progress:
+            progress(done)
+    invalidate_leaderboards()
+    return done
@@ -0,0 +1,82 @@
+# score/export.py
+import csv
+import json
+
+from .models import Match, Over, Player, PlayerMatchStats
+
+# -------------------------------
+# Streaming season exports
+# -------------------------------
+# Rows come straight from values_list().iterator(), so neither model instances
+# nor the result set are ever held in memory: an export of ten seasons uses
+# what an export of one does. Every dataset is filtered to what the user can
+# read, the same way the list views are; ``user=None`` exports everything.
+# Overs of archived matches stay in their MatchArchive (score.archive).
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _matches(user):
+    return Match.objects.all() if user is None else Match.objects.readable_by(user)
+
+
+def _season(queryset, season, field):
+    return queryset.filter(**{f'{field}__year': season}) if season else queryset
+
+
+# name: (columns, rows(user, season)); a column is a values_list() lookup
+DATASETS = {
+    'matches': (
+        ('id', 'match_number', 'date', 'team1__name', 'team2__name', 'total_overs',
+         'team1_runs', 'team1_wickets', 'team2_runs', 'team2_wickets', 'winners', 'completed'),
+        lambda user, season: _season(_matches(user), season, 'date'),
+    ),
+    'overs': (
+        ('id', 'match_no_id', 'match_no__date', 'bowling_team__name', 'over_no', 'bowler_id', 'bowler__name',
+         'runs', 'wickets', 'over_summary', 'deliveries'),
+        lambda user, season: _season(Over.objects.filter(match_no__in=_matches(user).values('pk')),
+                                     season, 'match_no__date'),
+    ),
+    'player_stats': (
+        ('id', 'match_id', 'match__date', 'player_id', 'player__name', 'runs', 'balls', 'wickets',
+         'overs_bowled', 'bowling_runs'),
+        lambda user, season: _season(PlayerMatchStats.objects.filter(match__in=_matches(user).values('pk')),
+                                     season, 'match__date'),
+    ),
+    'players': (
+        ('id', 'name', 'total_matches', 'total_runs', 'total_balls', 'total_dismissals', 'highest_score',
+         'total_wickets', 'total_balls_bowled', 'total_bowling_runs', 'best_bowling_wickets', 'best_bowling_runs'),
+        lambda user, season: Player.objects.all() if user is None else Player.objects.readable_by(user),
+    ),
+}
+
+
+def export_rows(dataset, user=None, season=None, chunk_size=CHUNK_SIZE):
+    """(columns, row iterator) for ``dataset``, in primary key order."""
+    columns, rows = DATASETS[dataset]
+    queryset = rows(user, season).order_by('pk').values_list(*columns)
+    return columns, queryset.iterator(chunk_size=chunk_size)
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each row instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def render_lines(columns, rows, fmt):
+    """Yield the export as text, one line at a time."""
+    if fmt == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    elif fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), default=str) + '\n'
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}")
@@ -33,4 +33,13 @@ class MatchForm(forms.ModelForm):
 
 
 class PlayerSearchForm(forms.Form):
-    name = forms.CharField(max_length=30, required=False, label='search by name')
\ No newline at end of file
+    name = forms.CharField(max_length=30, required=False, label='search by name')
+    prefix = forms.BooleanField(required=False, label='starts with')
+
+
+class TeamSearchForm(PlayerSearchForm):
+    pass
+
+
+class MatchSearchForm(PlayerSearchForm):
+    name = forms.CharField(max_length=30, required=False, label='search by team or number')
\ No newline at end of file
@@ -0,0 +1,346 @@
+# score/importer.py
+import csv
+import datetime
+import json
+import time
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Match, Over, Player, PlayerMatchStats, Team
+from .scoring import balls_to_overs, overs_to_balls
+
+# -------------------------------
+# Bulk import of historical scorecards
+# -------------------------------
+# One scorecard per match: the result, optionally the overs, and each
+# player's batting and bowling line. As JSON (a list) or JSON Lines (one per
+# line):
+#
+#   {"match_number": 12, "date": "2019-05-04", "team1": "Tigers", "team2": "Lions",
+#    "total_overs": 10, "team1_runs": 84, "team1_wickets": 6, "team2_runs": 80, "team2_wickets": 9,
+#    "winners": "Tigers",
+#    "overs": [{"bowling_team": "Lions", "over_no": 1, "bowler": "Ravi", "runs": 7, "wickets": 0,
+#               "summary": "1 0 4 0 2 0"}],
+#    "players": [{"team": "Tigers", "name": "Asha", "runs": 31, "balls": 24,
+#                 "wickets": 0, "overs_bowled": 0, "bowling_runs": 0}]}
+#
+# As CSV, a ``record`` column says what each row is: a ``match`` row starts a
+# scorecard and the ``over`` and ``player`` rows under it belong to it; the
+# other columns carry the same names as the JSON keys.
+#
+# Validation needs no queries: teams, players, squads and match numbers
+# already imported are loaded once into name indexes, and scorecards whose
+# match number the owner already has are skipped, so a re-run is harmless.
+# Rows are written with bulk_create, one transaction per batch of matches.
+# Matches arrive completed, for the career fold job or a rebuild to pick up;
+# a paper scorecard has no ball-by-ball data, so dismissals are not counted.
+FORMATS = ('csv', 'json', 'jsonl')
+NAME_LENGTH = 30  # Team.name, Player.name, Match.winners
+SUMMARY_LENGTH = 100  # Over.over_summary
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be parsed at all (as opposed to one invalid scorecard)."""
+
+
+def _key(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+# -------------------------------
+# Parsers: each yields one scorecard dict per match
+# -------------------------------
+def read_json(handle):
+    try:
+        cards = json.load(handle)
+    except json.JSONDecodeError as exc:
+        raise ImportFormatError(f"Invalid JSON: {exc}")
+    if not isinstance(cards, list):
+        raise ImportFormatError("Expected a JSON list of scorecards")
+    yield from cards
+
+
+def read_jsonl(handle):
+    for number, line in enumerate(handle, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ImportFormatError(f"Invalid JSON on line {number}: {exc}")
+
+
+def read_csv(handle):
+    card = None
+    for number, row in enumerate(csv.DictReader(handle), start=2):
+        record = (row.pop('record', None) or '').strip()
+        values = {field: value for field, value in row.items() if field and value not in (None, '')}
+        if record == 'match':
+            if card is not None:
+                yield card
+            card = dict(values, overs=[], players=[])
+        elif record in ('over', 'player'):
+            if card is None:
+                raise ImportFormatError(f"Line {number}: {record} row before any match row")
+            card[f'{record}s'].append(values)
+        else:
+            raise ImportFormatError(f"Line {number}: record must be match, over or player")
+    if card is not None:
+        yield card
+
+
+READERS = {'csv': read_csv, 'json': read_json, 'jsonl': read_jsonl}
+
+
+# -------------------------------
+# Importer
+# -------------------------------
+class ScorecardImporter:
+    def __init__(self, owner, batch_size=500, dry_run=False):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.counts = defaultdict(int)
+        self.errors = []
+        self.skipped = 0
+        self.elapsed = 0.0
+        self.match_ids = []  # the matches written, for the caller to fold into careers
+
+        # name indexes, loaded once and kept current as rows are created
+        self.teams = {}
+        for pk, name in Team.objects.filter(user=owner).order_by('-pk').values_list('pk', 'name'):
+            self.teams[_key(name)] = pk  # lowest pk wins for duplicate names
+        self.players = {}
+        for pk, name in Player.objects.filter(user=owner).order_by('-pk').values_list('pk', 'name'):
+            self.players[_key(name)] = pk
+        Membership = Team.players.through
+        self.squads = set(Membership.objects.filter(team__user=owner).values_list('team_id', 'player_id'))
+        self.match_numbers = set(Match.objects.filter(user=owner).values_list('match_number', flat=True))
+
+    def run(self, cards):
+        """Validate and write every scorecard in ``cards``; returns ``self``."""
+        started = time.perf_counter()
+        batch = []
+        for position, card in enumerate(cards, start=1):
+            try:
+                batch.append(self._clean(card))
+            except ValueError as exc:
+                number = card.get('match_number') if isinstance(card, dict) else None
+                self.errors.append(f"scorecard {position} (match {number}): {exc}")
+                continue
+            if batch[-1] is None:
+                self.skipped += 1
+                batch.pop()
+            elif len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+        self.elapsed = time.perf_counter() - started
+        return self
+
+    def report(self):
+        rows = sum(self.counts.values())
+        return {
+            'matches': self.counts['score.Match'],
+            'rows': dict(sorted(self.counts.items())),
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(rows / self.elapsed) if self.elapsed else None,
+            'dry_run': self.dry_run,
+        }
+
+    # -------------------------------
+    # Validation, in memory
+    # -------------------------------
+    def _clean(self, card):
+        """The scorecard with typed values; None if the owner already has it; ValueError if invalid."""
+        if not isinstance(card, dict):
+            raise ValueError("not an object")
+        number = _number(card, 'match_number', minimum=1)
+        if number in self.match_numbers:
+            return None
+
+        try:
+            date = datetime.date.fromisoformat(str(card.get('date', '')))
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+        team1, team2 = _name(card, 'team1'), _name(card, 'team2')
+        if _key(team1) == _key(team2):
+            raise ValueError("team1 and team2 are the same team")
+        sides = {_key(team1): team1, _key(team2): team2}
+        total_overs = _number(card, 'total_overs', minimum=1, default=2)
+        clean = {
+            'match_number': number, 'date': date, 'team1': team1, 'team2': team2, 'total_overs': total_overs,
+            'team1_runs': _number(card, 'team1_runs', default=0),
+            'team1_wickets': _number(card, 'team1_wickets', default=0),
+            'team2_runs': _number(card, 'team2_runs', default=0),
+            'team2_wickets': _number(card, 'team2_wickets', default=0),
+            'winners': _name(card, 'winners', required=False),
+            'overs': [], 'players': [],
+        }
+
+        seen_overs = set()
+        for over in _records(card, 'overs'):
+            bowling = _side(over, 'bowling_team', sides)
+            over_no = _number(over, 'over_no', minimum=1)
+            if over_no > total_overs:
+                raise ValueError(f"over {over_no} is past total_overs {total_overs}")
+            if (bowling, over_no) in seen_overs:
+                raise ValueError(f"over {over_no} by {bowling} appears twice")
+            seen_overs.add((bowling, over_no))
+            summary = str(over.get('summary') or '')
+            if len(summary) > SUMMARY_LENGTH:
+                raise ValueError(f"over {over_no} summary is longer than {SUMMARY_LENGTH} characters")
+            clean['overs'].append({
+                'bowling_team': bowling, 'over_no': over_no, 'bowler': _name(over, 'bowler'),
+                'runs': _number(over, 'runs', default=0), 'wickets': _number(over, 'wickets', default=0),
+                'summary': summary or None,
+            })
+
+        seen_players = set()
+        for line in _records(card, 'players'):
+            name = _name(line, 'name')
+            if _key(name) in seen_players:
+                raise ValueError(f"{name} has two lines")
+            seen_players.add(_key(name))
+            try:
+                overs_bowled = float(line.get('overs_bowled') or 0)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name}: overs_bowled must be a number of overs like 3.4")
+            if overs_bowled < 0 or round((overs_bowled - int(overs_bowled)) * 10) > 5:
+                raise ValueError(f"{name}: overs_bowled {overs_bowled} is not a number of overs")
+            clean['players'].append({
+                'team': _side(line, 'team', sides), 'name': name,
+                'runs': _number(line, 'runs', default=0), 'balls': _number(line, 'balls', default=0),
+                'wickets': _number(line, 'wickets', default=0),
+                'overs_bowled': balls_to_overs(overs_to_balls(overs_bowled)),
+                'bowling_runs': _number(line, 'bowling_runs', default=0),
+            })
+        self.match_numbers.add(number)  # a second copy further down the file is skipped
+        return clean
+
+    # -------------------------------
+    # Writing, one transaction per batch
+    # -------------------------------
+    def _insert(self, model, rows, reload=None):
+        """bulk_create ``rows``; ``reload`` fetches their primary keys where the backend returns none."""
+        model.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.counts[model._meta.label] += len(rows)
+        if reload is not None and rows and rows[0].pk is None:
+            for row, pk in zip(rows, reload().order_by('pk').values_list('pk', flat=True)):
+                row.pk = pk
+        return rows
+
+    def _resolve(self, model, index, names):
+        """Primary keys for ``names``, creating the ones the owner does not have yet."""
+        missing = {}
+        for name in names:
+            if _key(name) not in index:
+                missing.setdefault(_key(name), name)
+        if missing:
+            created = self._insert(model, [model(user=self.owner, name=name) for name in missing.values()],
+                                   reload=lambda: model.objects.filter(user=self.owner, name__in=missing.values()))
+            for row in created:
+                index[_key(row.name)] = row.pk
+
+    def _write(self, cards):
+        if self.dry_run:
+            self.counts['score.Match'] += len(cards)
+            self.counts['score.Over'] += sum(len(card['overs']) for card in cards)
+            self.counts['score.PlayerMatchStats'] += sum(len(card['players']) for card in cards)
+            return
+        with transaction.atomic():
+            self._resolve(Team, self.teams, [name for card in cards for name in (card['team1'], card['team2'])])
+            self._resolve(Player, self.players, [
+                name for card in cards
+                for name in [line['name'] for line in card['players']] + [over['bowler'] for over in card['overs']]
+            ])
+
+            # everyone who played for a side joins its squad
+            Membership = Team.players.through
+            pairs = []
+            for card in cards:
+                members = [(line['team'], line['name']) for line in card['players']]
+                members += [(over['bowling_team'], over['bowler']) for over in card['overs']]
+                for team, player in members:
+                    pair = (self.teams[_key(team)], self.players[_key(player)])
+                    if pair not in self.squads:
+                        self.squads.add(pair)
+                        pairs.append(Membership(team_id=pair[0], player_id=pair[1]))
+            self._insert(Membership, pairs)
+
+            matches = self._insert(Match, [
+                Match(user=self.owner, match_number=card['match_number'], date=card['date'],
+                      team1_id=self.teams[_key(card['team1'])], team2_id=self.teams[_key(card['team2'])],
+                      total_overs=card['total_overs'], winners=card['winners'], completed=True,
+                      team1_runs=card['team1_runs'], team1_wickets=card['team1_wickets'],
+                      team2_runs=card['team2_runs'], team2_wickets=card['team2_wickets'])
+                for card in cards
+            ], reload=lambda: Match.objects.filter(
+                user=self.owner, match_number__in=[card['match_number'] for card in cards]))
+            self.match_ids += [match.pk for match in matches]
+
+            overs, stats = [], []
+            for match, card in zip(matches, cards):
+                overs += [
+                    Over(user=self.owner, match_no_id=match.pk, bowling_team_id=self.teams[_key(over['bowling_team'])],
+                         over_no=over['over_no'], bowler_id=self.players[_key(over['bowler'])],
+                         runs=over['runs'], wickets=over['wickets'], over_summary=over['summary'],
+                         deliveries='')
+                    for over in card['overs']
+                ]
+                stats += [
+                    PlayerMatchStats(user=self.owner, match_id=match.pk, player_id=self.players[_key(line['name'])],
+                                     runs=line['runs'], balls=line['balls'], wickets=line['wickets'],
+                                     overs_bowled=line['overs_bowled'], bowling_runs=line['bowling_runs'])
+                    for line in card['players']
+                ]
+            self._insert(Over, overs)
+            self._insert(PlayerMatchStats, stats)
+
+
+# -------------------------------
+# Field helpers
+# -------------------------------
+def _records(card, field):
+    records = card.get(field) or []
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"{field} must be a list of objects")
+    return records
+
+
+def _number(record, field, minimum=0, default=None):
+    value = record.get(field, default)
+    if value in (None, ''):
+        if default is None:
+            raise ValueError(f"{field} is required")
+        value = default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a whole number")
+    if value < minimum:
+        raise ValueError(f"{field} must be at least {minimum}")
+    return value
+
+
+def _name(record, field, required=True):
+    name = ' '.join(str(record.get(field) or '').split())
+    if not name:
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    if len(name) > NAME_LENGTH:
+        raise ValueError(f"{field} is longer than {NAME_LENGTH} characters")
+    return name
+
+
+def _side(record, field, sides):
+    """The match's spelling of the team named in ``record[field]``; it must be one of the two sides."""
+    name = _name(record, field)
+    try:
+        return sides[_key(name)]
+    except KeyError:
+        raise ValueError(f"{field} {name!r} is not playing this match")
@@ -0,0 +1,189 @@
+# score/leaderboard.py
+import math
+import uuid
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Floor, Round
+
+from access.permissions import cache_version
+
+from .models import Player, PlayerMatchStats
+
+# -------------------------------
+# Leaderboards
+# -------------------------------
+# All-time boards rank the materialised Player career columns (indexed, see
+# Player.Meta) with keyset pagination straight in the database. Boards limited
+# to a date range have to aggregate PlayerMatchStats; that ranked list is
+# computed once and cached until the next match is folded into careers.
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_MIN_BALLS = 30
+RATIO_PLACES = 4
+
+
+def _legal_balls(field):
+    # overs_bowled is in cricket notation (2.3 = 15 balls)
+    return Floor(F(field)) * 6 + Round((F(field) - Floor(F(field))) * 10)
+
+
+def _ratio(numerator, denominator, scale):
+    # rounded in the database, so the ordering, the cursor and the page all see one value
+    return Round(Cast(numerator, FloatField()) * scale / denominator, RATIO_PLACES)
+
+
+METRICS = {
+    'runs': {
+        'label': "Most runs",
+        'career': F('total_runs'),
+        'period': Sum('runs'),
+        'descending': True,
+    },
+    'wickets': {
+        'label': "Most wickets",
+        'career': F('total_wickets'),
+        'period': Sum('wickets'),
+        'descending': True,
+    },
+    'strike_rate': {
+        'label': "Best strike rate",
+        'career': _ratio(F('total_runs'), F('total_balls'), 100),
+        'career_qualifier': F('total_balls'),
+        'period': _ratio(Sum('runs'), Sum('balls'), 100),
+        'period_qualifier': Sum('balls'),
+        'descending': True,
+    },
+    'economy': {
+        'label': "Best economy",
+        'career': _ratio(F('total_bowling_runs'), F('total_balls_bowled'), 6),
+        'career_qualifier': F('total_balls_bowled'),
+        'period': _ratio(Sum('bowling_runs'), Sum(_legal_balls('overs_bowled')), 6),
+        'period_qualifier': Sum(_legal_balls('overs_bowled')),
+        'descending': False,
+    },
+}
+
+
+def _version():
+    version = cache.get('leaderboard:version')
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set('leaderboard:version', version, None)
+    return version
+
+
+def invalidate_leaderboards():
+    cache.set('leaderboard:version', uuid.uuid4().hex, None)
+
+
+def encode_cursor(row):
+    return f"{row['value']}_{row['player_id']}_{row['rank']}"
+
+
+def decode_cursor(cursor):
+    """(value, player_id, rank) of the last row of the previous page; ValueError if malformed."""
+    value, player_id, rank = cursor.split('_')
+    value, player_id, rank = float(value), int(player_id), int(rank)
+    if not math.isfinite(value) or player_id < 1 or rank < 0:
+        raise ValueError("Bad leaderboard cursor")
+    return value, player_id, rank
+
+
+class Leaderboard:
+    def __init__(self, user, metric='runs', date_from=None, date_to=None, team_id=None,
+                 owner_id=None, min_balls=DEFAULT_MIN_BALLS):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown leaderboard: {metric}")
+        self.user = user
+        self.metric = metric
+        self.spec = METRICS[metric]
+        self.date_from, self.date_to = date_from, date_to
+        self.team_id, self.owner_id = team_id, owner_id
+        self.min_balls = max(int(min_balls), 1)
+
+    @property
+    def label(self):
+        return self.spec['label']
+
+    def _players(self):
+        players = Player.objects.readable_by(self.user)
+        if self.team_id:
+            players = players.filter(teams=self.team_id)
+        if self.owner_id:
+            players = players.filter(user_id=self.owner_id)
+        return players
+
+    def page(self, cursor=None, size=DEFAULT_PAGE_SIZE):
+        """One page of ``{'rank', 'player_id', 'name', 'value'}`` rows and the next cursor."""
+        after = decode_cursor(cursor) if cursor else None
+        if self.date_from or self.date_to:
+            rows = self._page_from_cached_list(after, size + 1)
+        else:
+            rows = self._page_from_careers(after, size + 1)
+        next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+        return rows[:size], next_cursor
+
+    # all-time: keyset query over the career columns
+    def _page_from_careers(self, after, limit):
+        descending = self.spec['descending']
+        qs = self._players().annotate(value=self.spec['career'])
+        if 'career_qualifier' in self.spec:
+            qs = qs.annotate(qualifier=self.spec['career_qualifier']).filter(qualifier__gte=self.min_balls)
+        else:
+            qs = qs.filter(value__gt=0)
+        start_rank = 0
+        if after:
+            value, player_id, start_rank = after
+            beyond = Q(value__lt=value) if descending else Q(value__gt=value)
+            qs = qs.filter(beyond | Q(value=value, pk__gt=player_id))
+        qs = qs.order_by('-value' if descending else 'value', 'pk').values('pk', 'name', 'value')[:limit]
+        return [
+            {'rank': start_rank + position, 'player_id': row['pk'], 'name': row['name'], 'value': row['value']}
+            for position, row in enumerate(qs, start=1)
+        ]
+
+    # date range: aggregate once, cache the ranked list, slice by keyset
+    def _ranked_list(self):
+        key = 'leaderboard:{}:{}:{}:{}:{}:{}:{}:{}:{}'.format(
+            _version(), self.user.pk, cache_version(self.user.pk), self.metric, self.date_from, self.date_to,
+            self.team_id, self.owner_id, self.min_balls,
+        )
+        ranked = cache.get(key)
+        if ranked is None:
+            stats = PlayerMatchStats.objects.filter(
+                match__completed=True, player__in=self._players().values('pk')
+            )
+            if self.date_from:
+                stats = stats.filter(match__date__gte=self.date_from)
+            if self.date_to:
+                stats = stats.filter(match__date__lte=self.date_to)
+            grouped = stats.values('player_id', 'player__name').annotate(value=self.spec['period'])
+            if 'period_qualifier' in self.spec:
+                grouped = grouped.annotate(qualifier=self.spec['period_qualifier']).filter(qualifier__gte=self.min_balls)
+            else:
+                grouped = grouped.filter(value__gt=0)
+            descending = self.spec['descending']
+            grouped = grouped.order_by('-value' if descending else 'value', 'player_id')
+            ranked = [
+                {'rank': rank, 'player_id': row['player_id'], 'name': row['player__name'], 'value': row['value']}
+                for rank, row in enumerate(grouped, start=1)
+            ]
+            cache.set(key, ranked, getattr(settings, 'LEADERBOARD_CACHE_TIMEOUT', 60 * 15))
+        return ranked
+
+    def _sort_key(self, value, player_id):
+        value = round(float(value), RATIO_PLACES)
+        return (-value if self.spec['descending'] else value, player_id)
+
+    def _page_from_cached_list(self, after, limit):
+        ranked = self._ranked_list()
+        start = 0
+        if after:
+            # seek past the cursor's (value, player) rather than trusting its rank
+            start = bisect_right(ranked, self._sort_key(*after[:2]),
+                                 key=lambda row: self._sort_key(row['value'], row['player_id']))
+        return ranked[start:start + limit]
+
@@ -0,0 +1,214 @@
+# score/league.py
+import datetime
+import random
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from access.models import AccessPermission
+
+from .models import Ball, Match, Over, Player, PlayerMatchStats, Team
+from .overcode import encode_delivery
+from .scoring import balls_to_overs
+
+# -------------------------------
+# Synthetic league generator
+# -------------------------------
+# Deterministic for a given seed. Every match is simulated ball by ball and
+# its overs, stats rows and team totals are derived from those balls, so the
+# dataset is as consistent as one scored through the UI. Rows are written with
+# bulk_create a chunk of matches per transaction, so memory stays flat at any size.
+
+# (event, bat runs, extras) and how often each happens
+DELIVERIES = [
+    (('R', 0, 0), 34), (('R', 1, 0), 30), (('R', 2, 0), 8), (('R', 3, 0), 1),
+    (('R', 4, 0), 10), (('R', 6, 0), 4), (('W', 0, 0), 5),
+    (('NB', 0, 1), 2), (('NB', 1, 1), 1), (('WD', 0, 1), 4), (('WD', 0, 2), 1),
+]
+START_DATE = datetime.date(2024, 1, 1)
+
+
+class LeagueGenerator:
+    def __init__(self, seed=0, users=10, teams_per_user=4, players_per_team=11, matches_per_user=50,
+                 overs=5, share_ratio=0.2, write_ratio=0.25, batch_size=1000, prefix='league', log=None):
+        self.rng = random.Random(seed)
+        self.users = users
+        self.teams_per_user = max(teams_per_user, 2)
+        self.players_per_team = max(players_per_team, 3)
+        self.matches_per_user = matches_per_user
+        self.overs = overs
+        self.share_ratio = share_ratio
+        self.write_ratio = write_ratio
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.log = log or (lambda message: None)
+        self.counts = defaultdict(int)
+        events, weights = zip(*DELIVERIES)
+        self._events, self._weights = events, weights
+
+    def _insert(self, model, rows, reload=None):
+        """bulk_create ``rows``; ``reload`` fetches their primary keys where the backend returns none."""
+        model.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.counts[model._meta.label] += len(rows)
+        if reload is not None and rows and rows[0].pk is None:
+            for row, pk in zip(rows, reload().order_by('pk').values_list('pk', flat=True)):
+                row.pk = pk
+        return rows
+
+    def generate(self):
+        """Write the whole league and return ``{owner: [team, ...]}``."""
+        password = make_password(None)  # unusable; log in with force_login or set one in the admin
+        owners = self._insert(User, [
+            User(username=f'{self.prefix}{number}', password=password) for number in range(self.users)
+        ], reload=lambda: User.objects.filter(username__startswith=self.prefix))
+        league = {}
+        for owner in owners:
+            with transaction.atomic():
+                league[owner] = teams = self._squads(owner)
+            # one transaction per chunk keeps undo/journal size bounded at any volume
+            for start in range(0, self.matches_per_user, self.batch_size):
+                with transaction.atomic():
+                    self._matches(owner, teams, start, min(self.batch_size, self.matches_per_user - start))
+            self.log(f"  {owner.username}: {self.matches_per_user} matches")
+        with transaction.atomic():
+            self._grants(owners)
+        return league
+
+    # -------------------------------
+    # Squads
+    # -------------------------------
+    def _squads(self, owner):
+        size = self.teams_per_user * self.players_per_team
+        players = self._insert(Player, [
+            Player(user=owner, name=f'{owner.username} player {index}') for index in range(size)
+        ], reload=lambda: Player.objects.filter(user=owner))
+        teams = self._insert(Team, [
+            Team(user=owner, name=f'{owner.username} team {index}') for index in range(self.teams_per_user)
+        ], reload=lambda: Team.objects.filter(user=owner))
+        Membership = Team.players.through
+        self._insert(Membership, [
+            Membership(team_id=team.pk, player_id=player.pk)
+            for index, team in enumerate(teams)
+            for player in players[index * self.players_per_team:(index + 1) * self.players_per_team]
+        ])
+        for index, team in enumerate(teams):
+            team.squad = [player.pk for player in players[index * self.players_per_team:(index + 1) * self.players_per_team]]
+        return teams
+
+    # -------------------------------
+    # Matches, simulated ball by ball
+    # -------------------------------
+    def _matches(self, owner, teams, start, count):
+        # Simulate first, so every total is known before its row is written once
+        names = {team.pk: team.name for team in teams}
+        matches, overs, balls, stats = [], [], [], {}
+        for index in range(count):
+            home, away = self.rng.sample(teams, 2)
+            match = Match(user=owner, match_number=start + index + 1, team1=home, team2=away,
+                          total_overs=self.overs, completed=True,
+                          date=START_DATE + datetime.timedelta(days=self.rng.randrange(730)))
+            batting_order = (home, away) if self.rng.random() < 0.5 else (away, home)
+            sequence = 0
+            for number, (batting, bowling) in enumerate((batting_order, batting_order[::-1]), start=1):
+                innings_overs = [
+                    Over(user=owner, match_no=match, bowling_team=bowling, over_no=over_no, runs=0, wickets=0,
+                         bowler_id=bowling.squad[-1 - (over_no - 1) % min(5, len(bowling.squad))])
+                    for over_no in range(1, self.overs + 1)
+                ]
+                runs, wickets, sequence = self._simulate(owner, match, batting, number, innings_overs,
+                                                         balls, stats, sequence)
+                slot = 1 if batting is home else 2
+                setattr(match, f'team{slot}_runs', runs)
+                setattr(match, f'team{slot}_wickets', wickets)
+                overs += innings_overs
+            if match.team1_runs != match.team2_runs:
+                match.winners = names[home.pk if match.team1_runs > match.team2_runs else away.pk]
+            matches.append(match)
+
+        self._insert(Match, matches, reload=lambda: Match.objects.filter(
+            user=owner, match_number__gt=start, match_number__lte=start + count))
+        self._insert(Over, overs, reload=lambda: Over.objects.filter(match_no__in=[match.pk for match in matches]))
+        self._insert(Ball, balls)
+        for line in stats.values():
+            line.overs_bowled = balls_to_overs(line.legal)
+        self._insert(PlayerMatchStats, list(stats.values()))
+
+    def _simulate(self, owner, match, batting, innings, overs, balls, stats, sequence):
+        order = list(batting.squad)
+        striker, non_striker, next_in = order[0], order[1], 2
+        runs = wickets = 0
+
+        def line(player_id):
+            key = (id(match), player_id)
+            if key not in stats:
+                stats[key] = PlayerMatchStats(user=owner, match=match, player_id=player_id)
+                stats[key].legal = 0
+            return stats[key]
+
+        for over in overs:
+            legal = index = 0
+            summary = []
+            while legal < 6 and wickets < len(order) - 1:
+                event, bat_runs, extras = self.rng.choices(self._events, self._weights)[0]
+                index += 1
+                sequence += 1
+                dismissed = striker if event == 'W' else None
+                balls.append(Ball(
+                    user=owner, match=match, innings=innings, over=over, ball_index=index,
+                    sequence=sequence, striker_id=striker, non_striker_id=non_striker,
+                    bowler_id=over.bowler_id, dismissed_id=dismissed, event=event, runs=bat_runs, extras=extras,
+                ))
+                over.deliveries += encode_delivery(event, bat_runs, extras)
+                total = bat_runs + extras
+                runs += total
+                over.runs += total
+                batter, bowler = line(striker), line(over.bowler_id)
+                batter.runs += bat_runs
+                batter.balls += event != 'WD'
+                bowler.bowling_runs += total
+                if event in ('NB', 'WD'):
+                    summary.append(f'{event}+{bat_runs if event == "NB" else extras - 1}')
+                    continue
+                legal += 1
+                bowler.legal += 1
+                if event == 'W':
+                    wickets += 1
+                    over.wickets += 1
+                    bowler.wickets += 1
+                    summary.append('W')
+                    if next_in < len(order):
+                        striker, next_in = order[next_in], next_in + 1
+                    continue
+                summary.append(str(bat_runs))
+                if bat_runs % 2:
+                    striker, non_striker = non_striker, striker
+            over.over_summary = ' '.join(summary)[:100]
+            striker, non_striker = non_striker, striker
+        return runs, wickets, sequence
+
+    # -------------------------------
+    # Sharing
+    # -------------------------------
+    def _grants(self, owners):
+        """Share ``share_ratio`` of each owner's matches and teams with one to three other owners."""
+        if len(owners) < 2:
+            return
+        grants = []
+        for owner in owners:
+            others = [other for other in owners if other.pk != owner.pk]
+            resources = [('match', pk) for pk in Match.objects.filter(user=owner).values_list('pk', flat=True)]
+            resources += [('team', pk) for pk in Team.objects.filter(user=owner).values_list('pk', flat=True)]
+            for field, pk in resources:
+                if self.rng.random() >= self.share_ratio:
+                    continue
+                for grantee in self.rng.sample(others, min(len(others), self.rng.randint(1, 3))):
+                    grants.append(AccessPermission(
+                        main_user=owner, user=grantee, access_type='W' if self.rng.random() < self.write_ratio else 'R',
+                        **{f'{field}_id': pk},
+                    ))
+                if len(grants) >= self.batch_size:
+                    self._insert(AccessPermission, grants)
+                    grants = []
+        self._insert(AccessPermission, grants)
@@ -0,0 +1,103 @@
+# score/live.py
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.dispatch import receiver
+
+from .signals import balls_recorded
+
+
+# -------------------------------
+# In-process pub/sub for live scores
+# -------------------------------
+class LiveBroker:
+    """Fans score deltas for a match out to every subscribed stream.
+
+    Each payload is encoded once per publish, however many subscribers there
+    are. ``publish`` may be called from any thread (sync views run in a
+    worker thread under ASGI); delivery hops onto each subscriber's event loop.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = defaultdict(set)  # match_id -> {(loop, queue)}
+        self._lock = threading.Lock()
+
+    def subscribe(self, match_id):
+        queue = asyncio.Queue(self.max_queue)
+        with self._lock:
+            self._subscribers[match_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, match_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(match_id, set())
+            subscribers.difference_update({sub for sub in subscribers if sub[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(match_id, None)
+
+    def subscriber_count(self, match_id):
+        with self._lock:
+            return len(self._subscribers.get(match_id, ()))
+
+    def publish(self, match_id, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers.get(match_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:  # loop already closed, the stream is gone
+                self.unsubscribe(match_id, queue)
+
+    @staticmethod
+    def _offer(queue, message):
+        if queue.full():
+            # A slow viewer loses its oldest delta rather than stalling the others
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+broker = LiveBroker()
+
+
+def ball_label(ball):
+    """Over-summary label, in the scoring UI's notation ("4", "W", "NB+2", "WD+1")."""
+    if ball.event == 'R':
+        return str(ball.runs)
+    if ball.event == 'W':
+        return 'W'
+    if ball.event == 'NB':
+        return f'NB+{ball.runs}'
+    return f'WD+{ball.extras - 1}'
+
+
+def ball_delta(ball, over, batting_slot):
+    """What a viewer needs to move its scoreboard on by one ball."""
+    return {
+        'seq': ball.sequence,
+        'label': ball_label(ball),
+        'innings': ball.innings,
+        'batting_slot': batting_slot,
+        'over_id': over.id,
+        'over_no': over.over_no,
+        'ball_index': ball.ball_index,
+        'event': ball.event,
+        'runs': ball.total_runs,
+        'bat_runs': ball.runs,
+        'extras': ball.extras,
+        'wicket': ball.event == 'W',
+        'dismissed_id': ball.dismissed_id,
+        'striker_id': ball.striker_id,
+        'non_striker_id': ball.non_striker_id,
+        'bowler_id': ball.bowler_id,
+    }
+
+
+@receiver(balls_recorded)
+def publish_balls(sender, match_id, deltas, **kwargs):
+    for delta in deltas:
+        broker.publish(match_id, 'ball', delta)
+
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from score.archive import archivable_matches, archive_matches, restore_match
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the overs, balls and innings state of completed matches older than "
+        "ARCHIVE_AFTER_DAYS into one compressed MatchArchive row per match. Their "
+        "scorecards stay readable. Run it from cron after materialize_career_stats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, help="Days; defaults to ARCHIVE_AFTER_DAYS.")
+        parser.add_argument('--limit', type=int, help="Archive at most this many matches.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the archivable matches.")
+        parser.add_argument('--restore', type=int, nargs='+', metavar='MATCH_ID',
+                            help="Move these matches back into the hot tables instead.")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            restored = sum(restore_match(match_id) for match_id in options['restore'])
+            self.stdout.write(self.style.SUCCESS(f"Restored {restored} match(es)."))
+            return
+        if options['dry_run']:
+            count = archivable_matches(options['older_than']).count()
+            self.stdout.write(f"{count} match(es) would be archived.")
+            return
+
+        def progress(done):
+            if done % 500 == 0:
+                self.stdout.write(f"  {done} archived")
+
+        archived = archive_matches(options['older_than'], options['limit'], progress)
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} match(es)."))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from access.models import AccessPermission
+from access.permissions import READ_TYPES
+from score.models import Over, PlayerMatchStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the database plan and mean latency of the per-ball lookups "
+        "(match stats, overs, access grants). Run it before and after "
+        "`migrate score 0008` / `migrate access 0002` to compare plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help="Executions timed per query.")
+
+    def handle(self, *args, **options):
+        stats = PlayerMatchStats.objects.order_by('-id').first()
+        over = Over.objects.order_by('-id').first()
+        grant = AccessPermission.objects.order_by('-id').first()
+        if stats is None or over is None:
+            raise CommandError("Needs at least one scored match.")
+
+        queries = {
+            "match stats by (match, player)": PlayerMatchStats.objects.filter(
+                match_id=stats.match_id, player_id=stats.player_id),
+            "over by (match, side, number)": Over.objects.filter(
+                match_no_id=over.match_no_id, bowling_team_id=over.bowling_team_id, over_no=over.over_no),
+            "active grants of a user": AccessPermission.objects.filter(
+                user_id=grant.user_id if grant else 0, active=True, access_type__in=READ_TYPES),
+        }
+        for label, queryset in queries.items():
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(queryset.all())
+            mean_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label}: {mean_ms:.3f} ms"))
+            self.stdout.write(queryset.explain())
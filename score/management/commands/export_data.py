@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from score.export import CHUNK_SIZE, DATASETS, FORMATS, export_rows, render_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream matches, overs, player_stats or players to CSV or JSON Lines in constant "
+        "memory. --user limits the rows to what that user can read in the app."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--season', type=int, help="Only matches played in this year (not for players).")
+        parser.add_argument('--user', help="Username whose read access filters the rows.")
+        parser.add_argument('--output', help="File to write; stdout when omitted.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}")
+
+        columns, rows = export_rows(options['dataset'], user, options['season'], options['chunk_size'])
+        lines = render_lines(columns, rows, options['format'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        count = -1 if options['format'] == 'csv' else 0  # the CSV header is not a row
+        with open(options['output'], 'w', newline='', encoding='utf-8') as handle:
+            for line in lines:
+                handle.write(line)
+                count += 1
+        self.stderr.write(self.style.SUCCESS(f"Wrote {count} {options['dataset']} row(s) to {options['output']}."))
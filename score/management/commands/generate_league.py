@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from score.career import rebuild_career_stats
+from score.league import LeagueGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic league (users, teams, players, matches scored "
+        "ball by ball, stats and access grants) for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--teams', type=int, default=4, help="Teams per user.")
+        parser.add_argument('--players', type=int, default=11, help="Players per team.")
+        parser.add_argument('--matches', type=int, default=50, help="Completed matches per user.")
+        parser.add_argument('--overs', type=int, default=5, help="Overs per innings.")
+        parser.add_argument('--share-ratio', type=float, default=0.2,
+                            help="Fraction of matches and teams shared with other users.")
+        parser.add_argument('--write-ratio', type=float, default=0.25, help="Fraction of grants that allow writes.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT.")
+        parser.add_argument('--prefix', default='league', help="Username prefix; must not be taken yet.")
+        parser.add_argument('--skip-careers', action='store_true',
+                            help="Leave Player career totals for rebuild_career_stats.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        generator = LeagueGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            teams_per_user=options['teams'],
+            players_per_team=options['players'],
+            matches_per_user=options['matches'],
+            overs=options['overs'],
+            share_ratio=options['share_ratio'],
+            write_ratio=options['write_ratio'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            log=self.stdout.write,
+        )
+        generator.generate()
+        if not options['skip_careers']:
+            rebuild_career_stats(chunk_size=options['batch_size'])
+
+        elapsed = time.perf_counter() - started
+        total = sum(generator.counts.values())
+        for label, count in sorted(generator.counts.items()):
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)."
+        ))
@@ -0,0 +1,56 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from score.career import fold_match
+from score.importer import FORMATS, READERS, ImportFormatError, ScorecardImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import historical scorecards from CSV, JSON or JSON Lines for one owner. "
+        "Teams and players are matched by name and created when missing; matches the "
+        "owner already has (by match number) are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Username that will own the imported rows.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Matches per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing.")
+        parser.add_argument('--skip-careers', action='store_true',
+                            help="Leave the imported matches for materialize_career_stats "
+                                 "instead of folding them into Player career totals.")
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}")
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {options['path']}; pass --format")
+
+        importer = ScorecardImporter(owner, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as handle:
+                importer.run(READERS[fmt](handle))
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+        if not options['dry_run'] and not options['skip_careers']:
+            # only the matches just written; every other match is already in the totals
+            for match_id in importer.match_ids:
+                fold_match(match_id)
+
+        report = importer.report()
+        for error in report['errors']:
+            self.stderr.write(f"  {error}")
+        for label, count in report['rows'].items():
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if options['dry_run'] else 'Imported'} {report['matches']} match(es), "
+            f"skipped {report['skipped']} already imported, {len(report['errors'])} invalid, "
+            f"in {report['seconds']}s ({report['rows_per_second']} rows/s)."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from score.career import fold_completed_matches
+
+
+class Command(BaseCommand):
+    help = "Fold completed matches into Player career totals (each match exactly once)."
+
+    def handle(self, *args, **options):
+        updated = fold_completed_matches()
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} player career line(s)."))
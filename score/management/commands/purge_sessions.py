@@ -0,0 +1,39 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseStore
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from django_session in small batches, so the "
+        "table stops growing without one long-running DELETE. Run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches, to go easy on a busy database.")
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, DatabaseStore):
+            # cache entries expire by themselves; signed cookies are never stored
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps nothing in the database; nothing to purge.")
+            return
+
+        Session = store.get_model_class()
+        cutoff = timezone.now()
+        purged = 0
+        while True:
+            keys = list(Session.objects.filter(expire_date__lt=cutoff)
+                        .values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            purged += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired session(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from score.career import rebuild_career_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute all Player career totals from completed matches, in chunks. "
+        "Pause the materialize_career_stats job while this runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Players per transaction.")
+
+    def handle(self, *args, **options):
+        done = rebuild_career_stats(
+            chunk_size=options['chunk_size'],
+            progress=lambda n: self.stdout.write(f"  {n} players rebuilt"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt career stats for {done} player(s)."))
@@ -0,0 +1,20 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from score.repair import merge_duplicate_grants, merge_duplicate_match_stats, merge_duplicate_overs
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge duplicate PlayerMatchStats, Over and AccessPermission rows left by "
+        "concurrent writes. Safe to run repeatedly."
+    )
+
+    def handle(self, *args, **options):
+        for label, merge in (
+            ("player match stats", merge_duplicate_match_stats),
+            ("overs", merge_duplicate_overs),
+            ("access grants", merge_duplicate_grants),
+        ):
+            self.stdout.write(f"  {label}: {merge(apps)} duplicate row(s) merged")
+        self.stdout.write(self.style.SUCCESS("Duplicates repaired."))
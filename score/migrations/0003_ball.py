@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0002_playermatchstats_bowling_runs_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ball',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('innings', models.PositiveSmallIntegerField(default=1)),
+                ('ball_index', models.PositiveSmallIntegerField()),
+                ('event', models.CharField(choices=[('R', 'Runs'), ('W', 'Wicket'), ('NB', 'No ball'), ('WD', 'Wide')], default='R', max_length=2)),
+                ('runs', models.PositiveSmallIntegerField(default=0)),
+                ('extras', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bowler', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balls_bowled', to='score.player')),
+                ('dismissed', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='score.player')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balls', to='score.match')),
+                ('non_striker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='score.player')),
+                ('over', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balls', to='score.over')),
+                ('striker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balls_faced', to='score.player')),
+                ('user', models.ForeignKey(default=None, on_delete=django.db.models.deletion.CASCADE, related_name='balls', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+def number_existing_balls(apps, schema_editor):
+    # Balls recorded before sequences existed get their log order as sequence
+    Ball = apps.get_model('score', 'Ball')
+    counters = {}
+    for ball in Ball.objects.order_by('id').only('id', 'match_id', 'innings'):
+        key = (ball.match_id, ball.innings)
+        counters[key] = counters.get(key, 0) + 1
+        Ball.objects.filter(pk=ball.pk).update(sequence=counters[key])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0003_ball'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ball',
+            name='sequence',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(number_existing_balls, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ball',
+            name='sequence',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AddConstraint(
+            model_name='ball',
+            constraint=models.UniqueConstraint(fields=('match', 'innings', 'sequence'), name='unique_ball_sequence'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0004_ball_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InningsState',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='state', serialize=False, to='score.match')),
+                ('innings', models.PositiveSmallIntegerField(default=1)),
+                ('toss_decision', models.CharField(blank=True, choices=[('bat', 'Bat'), ('bowl', 'Bowl')], max_length=4)),
+                ('batter_ids', models.JSONField(blank=True, default=list)),
+                ('outed_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batting_team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='score.team')),
+                ('bowler', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='score.player')),
+                ('bowling_team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='score.team')),
+                ('toss_winner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='score.team')),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0005_inningsstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='career_stats_applied',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='completed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='best_bowling_runs',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='best_bowling_wickets',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='highest_score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='total_balls_bowled',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='total_bowling_runs',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='total_dismissals',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0006_career_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['completed', 'date'], name='match_completed_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(models.OrderBy(models.F('total_runs'), descending=True), models.F('id'), name='player_runs_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(models.OrderBy(models.F('total_wickets'), descending=True), models.F('id'), name='player_wickets_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# Frozen here rather than imported from score.repair: a migration must keep
+# doing what it did when it was written, whatever the app code becomes.
+
+
+def _duplicate_groups(model, fields, **filters):
+    return (
+        model.objects.filter(**filters).values(*fields)
+        .annotate(rows=Count('id')).filter(rows__gt=1)
+        .order_by()
+    )
+
+
+def _to_balls(overs):
+    whole = int(overs)
+    return whole * 6 + round((overs - whole) * 10)
+
+
+def merge_duplicate_match_stats(apps, schema_editor):
+    """Sum duplicate PlayerMatchStats rows per (match, player) into the oldest one."""
+    PlayerMatchStats = apps.get_model('score', 'PlayerMatchStats')
+    for group in _duplicate_groups(PlayerMatchStats, ['match_id', 'player_id']):
+        rows = list(PlayerMatchStats.objects.filter(
+            match_id=group['match_id'], player_id=group['player_id']
+        ).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        for row in extra:
+            keep.runs += row.runs
+            keep.balls += row.balls
+            keep.wickets += row.wickets
+            keep.bowling_runs += row.bowling_runs
+        legal = sum(_to_balls(row.overs_bowled) for row in rows)
+        keep.overs_bowled = legal // 6 + (legal % 6) / 10
+        keep.save(update_fields=['runs', 'balls', 'wickets', 'bowling_runs', 'overs_bowled'])
+        PlayerMatchStats.objects.filter(pk__in=[row.pk for row in extra]).delete()
+
+
+def separate_innings(apps, schema_editor):
+    """Give each innings' overs their real bowling team before (match, bowling team, over) turns unique.
+
+    Overs used to be saved with the match's team2 as the bowling team in both
+    innings, so over N of the first and of the second innings collide. The
+    side an over's bowler plays for decides; failing that, the first over of
+    a group (by id) keeps its team and the next one gets the other side. No
+    over is merged and no ball moves. Only a true duplicate with nothing
+    recorded (no balls, runs, wickets or summary) is dropped; any other one
+    stops the migration so it can be looked at by hand.
+    """
+    Over = apps.get_model('score', 'Over')
+    Ball = apps.get_model('score', 'Ball')
+    Membership = apps.get_model('score', 'Team').players.through
+
+    # every over N of a match is settled together, whichever team it names now
+    groups = list(_duplicate_groups(Over, ['match_no_id', 'over_no'], bowling_team__isnull=False))
+    for group in groups:
+        overs = list(Over.objects.select_related('match_no').filter(
+            match_no_id=group['match_no_id'], over_no=group['over_no'], bowling_team__isnull=False,
+        ).order_by('id'))
+        match = overs[0].match_no
+        sides = [match.team1_id, match.team2_id]
+        teams_of = {}
+        for player_id, team_id in Membership.objects.filter(
+            player_id__in={over.bowler_id for over in overs}, team_id__in=sides,
+        ).values_list('player_id', 'team_id'):
+            teams_of.setdefault(player_id, set()).add(team_id)
+
+        # overs whose bowler plays for one side only are settled first
+        side_of = {}
+        for over in overs:
+            bowled_for = teams_of.get(over.bowler_id, set())
+            if len(bowled_for) == 1:
+                side_of[over.pk] = next(iter(bowled_for))
+        for over in overs:
+            if over.pk not in side_of:
+                taken = set(side_of.values())
+                free = [team for team in [over.bowling_team_id] + sides if team not in taken]
+                side_of[over.pk] = free[0] if free else over.bowling_team_id
+
+        for side in dict.fromkeys(side_of.values()):
+            bowled = [over for over in overs if side_of[over.pk] == side]
+            recorded = [over for over in bowled if over.runs or over.wickets or over.over_summary
+                        or Ball.objects.filter(over_id=over.pk).exists()]
+            if len(recorded) > 1:
+                raise RuntimeError(
+                    f"Overs {', '.join(str(over.pk) for over in recorded)} of match {match.pk} are all over "
+                    f"{group['over_no']} bowled by team {side}; fix them by hand, then migrate again."
+                )
+            keep = (recorded or bowled)[0]
+            Over.objects.filter(pk__in=[over.pk for over in bowled if over is not keep]).delete()
+            if side != keep.bowling_team_id:
+                Over.objects.filter(pk=keep.pk).update(bowling_team_id=side)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0007_leaderboard_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_match_stats, migrations.RunPython.noop),
+        migrations.RunPython(separate_innings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='over',
+            constraint=models.UniqueConstraint(fields=('match_no', 'bowling_team', 'over_no'), name='unique_over_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='playermatchstats',
+            constraint=models.UniqueConstraint(fields=('match', 'player'), name='unique_player_match_stats'),
+        ),
+    ]
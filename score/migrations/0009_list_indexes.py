@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:12
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0008_scoring_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['date', 'match_number', 'id'], name='match_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['name', 'id'], name='player_name_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='player_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['name', 'id'], name='team_name_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='team_name_prefix_idx'),
+        ),
+    ]
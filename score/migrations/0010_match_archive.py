@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0009_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchArchive',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='score.match')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='playermatchstats',
+            name='dismissals',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:42
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+# The version 1 encoder, frozen here rather than imported from score.overcode:
+# a migration must keep writing the codes it wrote, whatever the app code becomes.
+VERSION = '1'
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+
+def _value(event, runs, extras):
+    if event == 'R' and 0 <= runs <= 7 and not extras:
+        return runs
+    if event == 'NB' and 0 <= runs <= 7 and extras == 1:
+        return 8 + runs
+    if event == 'WD' and not runs and 1 <= extras <= 8:
+        return 15 + extras
+    if event == 'W' and 0 <= runs <= 3 and not extras:
+        return 32 + 8 * runs
+    raise ValueError(f"Cannot encode delivery {event} runs={runs} extras={extras}")
+
+
+def encode_balls(balls):
+    return ''.join(ALPHABET[_value(ball.event, ball.runs, ball.extras)] for ball in balls)
+
+
+def encode_recorded_overs(apps, schema_editor):
+    # overs with a ball log get their code; the rest (imported, archived) stay unknown
+    Ball = apps.get_model('score', 'Ball')
+    Over = apps.get_model('score', 'Over')
+    Over.objects.update(deliveries='')
+    balls = Ball.objects.order_by('over_id', 'id').only('over_id', 'event', 'runs', 'extras').iterator(chunk_size=2000)
+    pending = []
+    for over_id, over_balls in groupby(balls, key=lambda ball: ball.over_id):
+        try:
+            code = VERSION + encode_balls(over_balls)
+        except ValueError:
+            continue
+        if len(code) <= 64:
+            pending.append(Over(pk=over_id, deliveries=code))
+        if len(pending) >= 500:
+            Over.objects.bulk_update(pending, ['deliveries'])
+            pending = []
+    Over.objects.bulk_update(pending, ['deliveries'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0010_match_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='over',
+            name='deliveries',
+            field=models.CharField(blank=True, default='1', max_length=64),
+        ),
+        migrations.RunPython(encode_recorded_overs, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,41 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.contrib.auth.models import User  # Django's built-in User model
 
 
+class OwnedQuerySet(models.QuerySet):
+    """Filters rows down to the ones a user owns or has been granted access to."""
+
+    def readable_by(self, user):
+        return self._accessible_by(user, 'R')
+
+    def writable_by(self, user):
+        return self._accessible_by(user, 'W')
+
+    def _accessible_by(self, user, perm_type):
+        if not user.is_authenticated:
+            return self.none()
+        if user.is_superuser:
+            return self
+        from access.permissions import accessible_filter  # access.models imports this module
+        return self.filter(accessible_filter(user, self.model, perm_type))
+
+
 class Team(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="teams", default=None)  # owner
     name = models.CharField(max_length=30)
     players = models.ManyToManyField('Player', related_name='teams', blank=True)
 
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='team_name_order_idx'),  # list pages
+            models.Index(Upper('name'), name='team_name_prefix_idx'),  # "starts with" search
+        ]
+
     def __str__(self):
         return self.name
 
@@ -19,10 +47,44 @@ class Player(models.Model):
     total_wickets = models.IntegerField(default=0)
     total_matches = models.IntegerField(default=0)
     total_balls = models.IntegerField(default=0)
+    # career figures folded in from completed matches (see score.career)
+    total_dismissals = models.IntegerField(default=0)
+    total_balls_bowled = models.IntegerField(default=0)
+    total_bowling_runs = models.IntegerField(default=0)
+    highest_score = models.IntegerField(default=0)
+    best_bowling_wickets = models.IntegerField(default=0)
+    best_bowling_runs = models.IntegerField(default=0)
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='player_name_order_idx'),  # list pages
+            models.Index(Upper('name'), name='player_name_prefix_idx'),  # "starts with" search
+            # all-time leaderboards walk these in rank order (score.leaderboard)
+            models.Index(F('total_runs').desc(), 'id', name='player_runs_rank_idx'),
+            models.Index(F('total_wickets').desc(), 'id', name='player_wickets_rank_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def strike_rate(self):
+        return round(self.total_runs * 100 / self.total_balls, 2) if self.total_balls else 0.0
+
+    @property
+    def batting_average(self):
+        return round(self.total_runs / self.total_dismissals, 2) if self.total_dismissals else None
+
+    @property
+    def economy(self):
+        return round(self.total_bowling_runs * 6 / self.total_balls_bowled, 2) if self.total_balls_bowled else None
+
+    @property
+    def best_bowling(self):
+        return f"{self.best_bowling_wickets}/{self.best_bowling_runs}" if self.total_balls_bowled else "-"
+
 
 class Match(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="matches", default=None)  # owner
@@ -36,6 +98,17 @@ class Match(models.Model):
     team1_wickets = models.IntegerField(default=0)
     team2_runs = models.IntegerField(default=0)
     team2_wickets = models.IntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    career_stats_applied = models.BooleanField(default=False)  # folded into Player totals
+    archived = models.BooleanField(default=False)  # overs and balls live in MatchArchive (score.archive)
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['completed', 'date'], name='match_completed_date_idx'),
+            models.Index(fields=['date', 'match_number', 'id'], name='match_list_order_idx'),
+        ]
 
     def __str__(self):
         return f"Match {self.match_number} - {self.team1.name} vs {self.team2.name} on {self.date}"
@@ -50,6 +123,13 @@ class Over(models.Model):
     runs = models.IntegerField(default=0)
     wickets = models.IntegerField(default=0)
     over_summary = models.CharField(max_length=100, blank=True, null=True)
+    deliveries = models.CharField(max_length=64, default='1', blank=True)  # ball-by-ball code, see score.overcode
+
+    class Meta:
+        constraints = [
+            # the bowling team tells the innings apart; each starts again at over 1
+            models.UniqueConstraint(fields=['match_no', 'bowling_team', 'over_no'], name='unique_over_number'),
+        ]
 
     def __str__(self):
         return f"Over {self.over_no} | {self.bowler.name} - Runs: {self.runs}, Wickets: {self.wickets}"
@@ -65,6 +145,86 @@ class PlayerMatchStats(models.Model):
     wickets = models.IntegerField(default=0)
     overs_bowled = models.FloatField(default=0.0)
     bowling_runs = models.IntegerField(default=0)
+    dismissals = models.PositiveSmallIntegerField(default=0)  # filled when the ball log is archived
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'player'], name='unique_player_match_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.player.name} in Match {self.match.match_number}"
+
+class Ball(models.Model):
+    """One delivery. The source of truth every scoring total is derived from."""
+    EVENTS = (
+        ('R', 'Runs'),
+        ('W', 'Wicket'),
+        ('NB', 'No ball'),
+        ('WD', 'Wide'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="balls", default=None)  # scorer
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="balls")
+    innings = models.PositiveSmallIntegerField(default=1)
+    over = models.ForeignKey(Over, on_delete=models.CASCADE, related_name="balls")
+    ball_index = models.PositiveSmallIntegerField()  # position in the over, extras included
+    sequence = models.PositiveIntegerField()  # client-generated idempotency key within the innings
+    striker = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="balls_faced")
+    non_striker = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="+")
+    bowler = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="balls_bowled")
+    dismissed = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="+", null=True, blank=True)
+    event = models.CharField(max_length=2, choices=EVENTS, default='R')
+    runs = models.PositiveSmallIntegerField(default=0)  # off the bat
+    extras = models.PositiveSmallIntegerField(default=0)  # no-ball / wide penalty runs
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # A retried submission of the same delivery hits this instead of double counting
+            models.UniqueConstraint(fields=['match', 'innings', 'sequence'], name='unique_ball_sequence'),
+        ]
+
+    @property
+    def is_legal(self):
+        return self.event not in ('NB', 'WD')
+
+    @property
+    def total_runs(self):
+        return self.runs + self.extras
+
+    def __str__(self):
+        return f"Match {self.match_id} | Over {self.over_id}.{self.ball_index} {self.event} {self.total_runs}"
+
+
+class InningsState(models.Model):
+    """Live scoring state of a match, shared by every device scoring it."""
+    DECISIONS = (
+        ('bat', 'Bat'),
+        ('bowl', 'Bowl'),
+    )
+
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, primary_key=True, related_name="state")
+    innings = models.PositiveSmallIntegerField(default=1)
+    toss_winner = models.ForeignKey(Team, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    toss_decision = models.CharField(max_length=4, choices=DECISIONS, blank=True)
+    batting_team = models.ForeignKey(Team, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    bowling_team = models.ForeignKey(Team, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    bowler = models.ForeignKey(Player, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    batter_ids = models.JSONField(default=list, blank=True)  # batters still to come in
+    outed_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Match {self.match_id} state (innings {self.innings})"
+
+
+class MatchArchive(models.Model):
+    """A completed match's overs, balls and innings state as one compressed blob (see score.archive)."""
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, primary_key=True, related_name="archive")
+    version = models.PositiveSmallIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.BinaryField()
 
     def __str__(self):
-        return f"{self.player.name} in Match {self.match.match_number}"
\ No newline at end of file
+        return f"Match {self.match_id} archive (v{self.version})"
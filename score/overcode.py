@@ -0,0 +1,107 @@
+# score/overcode.py
+from collections import namedtuple
+
+# -------------------------------
+# Compact per-over delivery code
+# -------------------------------
+# Over.deliveries holds an over ball by ball as a short ASCII string: a
+# version character, then one character per delivery. Each character is a
+# 6-bit value from the URL-safe base64 alphabet:
+#
+#    0-7   runs off the bat (0..7)
+#    8-15  no ball, 1 penalty run, plus 0..7 off the bat
+#   16-23  wide, 1..8 extras in all
+#   24-31  reserved
+#   32-63  wicket: 32 + 8 * runs completed (0..3); the values between are reserved
+#
+# Appending is a plain string concatenation, so a ball updates its over with
+# the same single UPDATE that moves the over's totals, and a whole innings
+# replays from its over rows without touching the ball log. An empty code
+# means the over's deliveries are unknown (imported, or beyond the encoding).
+VERSION = '1'
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+MAX_LENGTH = 64  # Over.deliveries: the version plus 63 deliveries
+
+Delivery = namedtuple('Delivery', 'event runs extras')
+
+
+def _value(event, runs, extras):
+    if event == 'R' and 0 <= runs <= 7 and not extras:
+        return runs
+    if event == 'NB' and 0 <= runs <= 7 and extras == 1:
+        return 8 + runs
+    if event == 'WD' and not runs and 1 <= extras <= 8:
+        return 15 + extras
+    if event == 'W' and 0 <= runs <= 3 and not extras:
+        return 32 + 8 * runs
+    raise ValueError(f"Cannot encode delivery {event} runs={runs} extras={extras}")
+
+
+def _delivery(value):
+    if value < 8:
+        return Delivery('R', value, 0)
+    if value < 16:
+        return Delivery('NB', value - 8, 1)
+    if value < 24:
+        return Delivery('WD', 0, value - 15)
+    if value >= 32 and value % 8 == 0:
+        return Delivery('W', (value - 32) // 8, 0)
+    return None
+
+
+# every possible character decoded once, so decoding is a lookup per delivery
+_DECODE = {ALPHABET[value]: _delivery(value) for value in range(64) if _delivery(value)}
+
+
+def encode_delivery(event, runs=0, extras=0):
+    """One delivery (a Ball's event, runs and extras) as its code character."""
+    return ALPHABET[_value(event, runs, extras)]
+
+
+def encode_balls(balls):
+    """The code characters of ``balls``, in order, ready to append to an over."""
+    return ''.join(encode_delivery(ball.event, ball.runs, ball.extras) for ball in balls)
+
+
+def encode_over(deliveries):
+    """A full over code from ``Delivery`` tuples (or plain (event, runs, extras) tuples)."""
+    return VERSION + ''.join(encode_delivery(*delivery) for delivery in deliveries)
+
+
+def decode_over(code):
+    """The over's deliveries as ``Delivery`` tuples."""
+    if not code:
+        return []
+    if code[0] != VERSION:
+        raise ValueError(f"Unknown over code version {code[0]!r}")
+    try:
+        return [_DECODE[char] for char in code[1:]]
+    except KeyError as exc:
+        raise ValueError(f"Invalid delivery code {exc.args[0]!r}")
+
+
+def delivery_label(delivery):
+    """The scoring UI's notation for one delivery ("4", "W", "NB+2", "WD+1")."""
+    event, runs, extras = delivery
+    if event == 'R':
+        return str(runs)
+    if event == 'W':
+        return 'W'
+    if event == 'NB':
+        return f'NB+{runs}'
+    return f'WD+{extras - 1}'
+
+
+def over_summary(code):
+    """The over in the scoring UI's notation, as stored in Over.over_summary."""
+    return ' '.join(delivery_label(delivery) for delivery in decode_over(code))
+
+
+def replay_innings(overs):
+    """Flatten (over_no, bowler_id, code) rows, e.g. from one values_list() query, into
+    (over_no, bowler_id, ball_index, Delivery) for every delivery of the innings."""
+    return [
+        (over_no, bowler_id, index, delivery)
+        for over_no, bowler_id, code in sorted(overs, key=lambda row: row[0])
+        for index, delivery in enumerate(decode_over(code), start=1)
+    ]
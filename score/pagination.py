@@ -0,0 +1,77 @@
+# score/pagination.py
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# -------------------------------
+# Keyset (cursor) pagination
+# -------------------------------
+# A page is "the next ``size`` rows after this one" in a total ordering that
+# ends in a unique column, so the database seeks straight to it through an
+# index instead of counting past OFFSET rows. The cost of a page stays flat
+# however many rows the user has; there is no total count or page number.
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+
+def _scalar(value):
+    # what encode_cursor() writes for a column value: text, or a number a database column can hold
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, (str, float)) or (isinstance(value, int) and -2 ** 63 <= value < 2 ** 63)
+
+
+def decode_cursor(cursor, length=None):
+    """The ordering values of the last row of the previous page; ValueError if malformed.
+
+    A cursor comes back from the client, so anything but a list of ``length``
+    plain values is refused here rather than reaching the query.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Bad cursor") from exc
+    if not isinstance(values, list) or not all(_scalar(value) for value in values):
+        raise ValueError("Bad cursor")
+    if length is not None and len(values) != length:
+        raise ValueError("Bad cursor")
+    return values
+
+
+def _after(ordering, values):
+    """Rows strictly after ``values`` in ``ordering``: (a > x) or (a = x and b > y) or ..."""
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        ties = {other.lstrip('-'): value for other, value in zip(ordering[:position], values)}
+        condition |= Q(**ties, **{f'{name}__{lookup}': values[position]})
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor=None, size=PAGE_SIZE):
+    """One page of ``queryset`` in ``ordering`` and the cursor for the next page (or None).
+
+    ``ordering`` must end in a unique field (normally ``'id'``).
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, len(ordering))
+        try:
+            queryset = queryset.filter(_after(ordering, values))
+        except (TypeError, ValidationError) as exc:  # a value the column can't take, e.g. text for a date
+            raise ValueError("Bad cursor") from exc
+    rows = list(queryset[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, field.lstrip('-')) for field in ordering])
+    return rows, next_cursor
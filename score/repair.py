@@ -0,0 +1,83 @@
+# score/repair.py
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .scoring import balls_to_overs, overs_to_balls
+
+# -------------------------------
+# Duplicate-row repair
+# -------------------------------
+# Rows written before the (match, player) and (match, bowling team, over)
+# unique constraints can be duplicated by concurrent scorers or retried
+# requests. Each helper folds a duplicate group into its oldest row.
+#
+# They take an app registry; the repair_duplicates command passes the live
+# one. Migration 0008 keeps its own frozen copies, and it gives legacy overs
+# of the second innings their bowling team instead of merging them.
+
+
+def _duplicate_groups(model, fields, **filters):
+    return (
+        model.objects.filter(**filters).values(*fields)
+        .annotate(rows=Count('id'), keep=Min('id')).filter(rows__gt=1)
+        .order_by()
+    )
+
+
+@transaction.atomic
+def merge_duplicate_match_stats(apps):
+    """Sum duplicate PlayerMatchStats rows per (match, player). Returns rows removed."""
+    PlayerMatchStats = apps.get_model('score', 'PlayerMatchStats')
+    removed = 0
+    for group in _duplicate_groups(PlayerMatchStats, ['match_id', 'player_id']):
+        rows = list(PlayerMatchStats.objects.filter(
+            match_id=group['match_id'], player_id=group['player_id']
+        ).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        for row in extra:
+            keep.runs += row.runs
+            keep.balls += row.balls
+            keep.wickets += row.wickets
+            keep.bowling_runs += row.bowling_runs
+        keep.overs_bowled = balls_to_overs(sum(overs_to_balls(row.overs_bowled) for row in rows))
+        keep.save(update_fields=['runs', 'balls', 'wickets', 'bowling_runs', 'overs_bowled'])
+        removed += PlayerMatchStats.objects.filter(pk__in=[row.pk for row in extra]).delete()[0]
+    return removed
+
+
+@transaction.atomic
+def merge_duplicate_overs(apps):
+    """Merge overs sharing (match, bowling team, over number); their balls move to the kept row."""
+    Over = apps.get_model('score', 'Over')
+    Ball = apps.get_model('score', 'Ball')
+    removed = 0
+    # Overs without a bowling team cannot tell the innings apart, so they are left alone
+    groups = _duplicate_groups(Over, ['match_no_id', 'bowling_team_id', 'over_no'], bowling_team__isnull=False)
+    for group in groups:
+        rows = list(Over.objects.filter(
+            match_no_id=group['match_no_id'], bowling_team_id=group['bowling_team_id'], over_no=group['over_no']
+        ).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        extra_ids = [row.pk for row in extra]
+        Ball.objects.filter(over_id__in=extra_ids).update(over_id=keep.pk)
+        keep.runs = sum(row.runs for row in rows)
+        keep.wickets = sum(row.wickets for row in rows)
+        keep.over_summary = ' '.join(row.over_summary for row in rows if row.over_summary) or keep.over_summary
+        keep.save(update_fields=['runs', 'wickets', 'over_summary'])
+        removed += Over.objects.filter(pk__in=extra_ids).delete()[0]
+    return removed
+
+
+@transaction.atomic
+def merge_duplicate_grants(apps):
+    """Drop repeated AccessPermission grants of the same access to the same resource."""
+    AccessPermission = apps.get_model('access', 'AccessPermission')
+    removed = 0
+    groups = _duplicate_groups(
+        AccessPermission, ['user_id', 'match_id', 'player_id', 'team_id', 'access_type', 'active']
+    )
+    for group in groups:
+        group.pop('rows')
+        keep = group.pop('keep')
+        removed += AccessPermission.objects.filter(**group).exclude(pk=keep).delete()[0]
+    return removed
@@ -0,0 +1,216 @@
+# score/scorecard.py
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+
+from .live import ball_delta
+from .models import Ball, Match, Player
+from .scoring import balls_to_overs, batting_slot
+from .signals import balls_recorded
+
+
+# -------------------------------
+# Cached per-match scorecard
+# -------------------------------
+# The card is built from the ball log once, then moved on ball by ball from
+# the same deltas the live stream uses, so a reader is a single cache get.
+def _key(match_id):
+    return f'scorecard:{match_id}'
+
+
+def _timeout():
+    return getattr(settings, 'SCORECARD_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def empty_scorecard(match, players):
+    def side(team_id, name):
+        return {
+            'team_id': team_id, 'team': name,
+            'runs': 0, 'wickets': 0, 'legal_balls': 0, 'extras': 0,
+            'batting': {}, 'bowling': {}, 'fall_of_wickets': [],
+            'run_rate': 0.0, 'required_rate': None, 'target': None,
+        }
+
+    return {
+        'match_id': match.id,
+        'match_number': match.match_number,
+        'total_overs': match.total_overs,
+        'last_seq': 0,
+        'players': players,  # player_id -> name
+        'batting_order': [],  # batting slots in the order they batted
+        'over': None,  # current over: id, over_no, bowler_id, summary labels
+        'striker_id': None,
+        'non_striker_id': None,
+        'bowler_id': None,
+        'sides': {1: side(match.team1_id, match.team1.name), 2: side(match.team2_id, match.team2.name)},
+    }
+
+
+def _player(card, player_id):
+    return card['players'].get(player_id) or f'Player {player_id}'
+
+
+def apply_delta(card, delta):
+    """Move ``card`` on by one ball (a ``score.live.ball_delta`` dict)."""
+    slot = delta['batting_slot']
+    side = card['sides'][slot]
+    bowling_slot = 2 if slot == 1 else 1
+    if slot not in card['batting_order']:
+        card['batting_order'].append(slot)
+
+    side['runs'] += delta['runs']
+    side['extras'] += delta['extras']
+    legal = delta['event'] not in ('NB', 'WD')
+    side['legal_balls'] += int(legal)
+
+    for player_id in (delta['striker_id'], delta['non_striker_id']):
+        side['batting'].setdefault(player_id, {
+            'name': _player(card, player_id), 'runs': 0, 'balls': 0, 'fours': 0, 'sixes': 0, 'out': False,
+        })
+    batter = side['batting'][delta['striker_id']]
+    batter['runs'] += delta['bat_runs']
+    batter['balls'] += int(delta['event'] != 'WD')
+    batter['fours'] += int(delta['bat_runs'] == 4)
+    batter['sixes'] += int(delta['bat_runs'] == 6)
+
+    bowler = card['sides'][bowling_slot]['bowling'].setdefault(delta['bowler_id'], {
+        'name': _player(card, delta['bowler_id']), 'legal_balls': 0, 'runs': 0, 'wickets': 0,
+    })
+    bowler['legal_balls'] += int(legal)
+    bowler['runs'] += delta['runs']
+
+    if delta['wicket']:
+        side['wickets'] += 1
+        bowler['wickets'] += 1
+        dismissed = delta['dismissed_id'] or delta['striker_id']
+        side['batting'].setdefault(dismissed, {
+            'name': _player(card, dismissed), 'runs': 0, 'balls': 0, 'fours': 0, 'sixes': 0, 'out': False,
+        })['out'] = True
+        side['fall_of_wickets'].append({
+            'wicket': side['wickets'],
+            'runs': side['runs'],
+            'player_id': dismissed,
+            'name': _player(card, dismissed),
+            'overs': balls_to_overs(side['legal_balls']),
+        })
+
+    if card['over'] is None or card['over']['id'] != delta['over_id']:
+        card['over'] = {'id': delta['over_id'], 'over_no': delta['over_no'],
+                        'bowler_id': delta['bowler_id'], 'summary': []}
+    card['over']['summary'].append(delta['label'])
+    card['striker_id'] = delta['striker_id']
+    card['non_striker_id'] = delta['non_striker_id']
+    card['bowler_id'] = delta['bowler_id']
+    card['last_seq'] = max(card['last_seq'], delta['seq'])
+    _refresh_rates(card)
+    return card
+
+
+def _refresh_rates(card):
+    total_balls = card['total_overs'] * 6
+    for side in card['sides'].values():
+        side['overs'] = balls_to_overs(side['legal_balls'])
+        side['run_rate'] = round(side['runs'] * 6 / side['legal_balls'], 2) if side['legal_balls'] else 0.0
+        for bowler in side['bowling'].values():
+            bowler['overs'] = balls_to_overs(bowler['legal_balls'])
+            bowler['economy'] = round(bowler['runs'] * 6 / bowler['legal_balls'], 2) if bowler['legal_balls'] else 0.0
+        for batter in side['batting'].values():
+            batter['strike_rate'] = round(batter['runs'] * 100 / batter['balls'], 2) if batter['balls'] else 0.0
+    if len(card['batting_order']) == 2:
+        first, second = (card['sides'][slot] for slot in card['batting_order'])
+        second['target'] = first['runs'] + 1
+        remaining = total_balls - second['legal_balls']
+        needed = second['target'] - second['runs']
+        second['required_rate'] = round(needed * 6 / remaining, 2) if remaining > 0 and needed > 0 else None
+
+
+def build_scorecard(match_id):
+    """Rebuild the scorecard from the database (the ball log plus team rosters).
+
+    An archived match has no ball log left; its card was frozen into the archive.
+    """
+    match = Match.objects.select_related('team1', 'team2').get(pk=match_id)
+    if match.archived:
+        from .archive import archived_scorecard  # score.archive builds cards with this module
+        return archived_scorecard(match.pk)
+    players = dict(
+        Player.objects.filter(teams__in=[match.team1_id, match.team2_id])
+        .values_list('id', 'name').distinct()
+    )
+    balls = list(Ball.objects.filter(match=match).select_related('over').order_by('id'))
+    # Players scored for without being on either roster
+    unknown = {pid for ball in balls for pid in (ball.striker_id, ball.non_striker_id, ball.bowler_id)} - set(players)
+    if unknown:
+        players.update(Player.objects.filter(pk__in=unknown).values_list('id', 'name'))
+
+    card = empty_scorecard(match, players)
+    for ball in balls:
+        apply_delta(card, ball_delta(ball, ball.over, batting_slot(match, ball.over, ball.innings)))
+    return card
+
+
+def _locks(match_id):
+    return f'{_key(match_id)}:lock', f'{_key(match_id)}:dirty'
+
+
+def _rebuild_scorecard(match_id):
+    """Build the card and cache it, under the same lock and dirty flag as update_cached_scorecard.
+
+    A ball committed while the card is built may be missing from it, and its
+    worker finds no card to move on; it flags the card dirty instead, so the
+    card is dropped again rather than served stale until it expires.
+    """
+    lock, dirty = _locks(match_id)
+    if not cache.add(lock, 1, 5):
+        return build_scorecard(match_id)  # a ball is being applied: serve this build, don't cache it
+    try:
+        card = build_scorecard(match_id)
+        cache.set(_key(match_id), card, _timeout())
+        if cache.get(dirty):
+            invalidate_scorecard(match_id)
+        return card
+    finally:
+        cache.delete_many([dirty, lock])
+
+
+def get_scorecard(match_id):
+    """The match's scorecard: a cache hit normally, a rebuild from the database on a miss."""
+    card = cache.get(_key(match_id))
+    if card is None:
+        card = _rebuild_scorecard(match_id)
+    return card
+
+
+async def aget_scorecard(match_id):
+    """get_scorecard() for async views; only a miss leaves the event loop, to rebuild the card."""
+    card = await cache.aget(_key(match_id))
+    if card is None:
+        card = await sync_to_async(_rebuild_scorecard)(match_id)
+    return card
+
+
+def invalidate_scorecard(match_id):
+    cache.delete(_key(match_id))
+
+
+@receiver(balls_recorded)
+def update_cached_scorecard(sender, match_id, deltas, **kwargs):
+    lock, dirty = _locks(match_id)
+    if not cache.add(lock, 1, 5):
+        # Another worker is mid-update, or mid-rebuild, and may write back a card
+        # without these balls: flag it so the lock holder drops its card, and drop this one
+        cache.set(dirty, 1, _timeout())
+        invalidate_scorecard(match_id)
+        return
+    try:
+        card = cache.get(_key(match_id))
+        if card is None:
+            return  # the next reader rebuilds it
+        for delta in deltas:
+            apply_delta(card, delta)
+        cache.set(_key(match_id), card, _timeout())
+        if cache.get(dirty):
+            invalidate_scorecard(match_id)
+    finally:
+        cache.delete_many([dirty, lock])
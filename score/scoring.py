@@ -0,0 +1,436 @@
+# score/scoring.py
+from collections import defaultdict
+from functools import partial
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, Count, F, Func, Max, OuterRef, Q, Subquery, Value, When, sql
+from django.db.models.functions import Coalesce, Concat, Floor, Length, Mod, Round
+from django.db.models.lookups import LessThanOrEqual
+
+from .live import ball_delta
+from .models import Ball, Match, Over, Player, PlayerMatchStats
+from .overcode import MAX_LENGTH, VERSION, encode_balls
+from .signals import balls_recorded
+from .state import mark_out
+
+
+# Server-assigned sequences tried before giving up to concurrent scorers
+SEQUENCE_ATTEMPTS = 5
+
+
+# -------------------------------
+# Event parsing
+# -------------------------------
+def parse_event(event):
+    """Turn a scoring-UI event ("0".."6", "W", "NB+2", "WD+1") into (code, runs, extras)."""
+    event = str(event).strip().upper()
+    if event.isdigit() and int(event) <= 6:
+        return 'R', int(event), 0
+    if event == 'W':
+        return 'W', 0, 0
+    if event[:2] in ('NB', 'WD'):
+        code, rest = event[:2], event[2:].lstrip('+')
+        if rest and not rest.isdigit():
+            raise ValueError(f"Unknown ball event: {event}")
+        runs = int(rest or 0)
+        if code == 'NB':
+            return 'NB', runs, 1
+        return 'WD', 0, 1 + runs  # anything run off a wide is extras too
+    raise ValueError(f"Unknown ball event: {event}")
+
+
+# -------------------------------
+# Cricket over notation (2.3 = 2 overs and 3 balls)
+# -------------------------------
+def balls_to_overs(balls):
+    return balls // 6 + (balls % 6) / 10
+
+
+def overs_to_balls(overs):
+    whole = int(overs)
+    return whole * 6 + round((overs - whole) * 10)
+
+
+def batting_slot(match, over, innings=1):
+    """1 when team1 is batting during ``over``, 2 when team2 is."""
+    if over.bowling_team_id is not None:
+        return 2 if over.bowling_team_id == match.team1_id else 1
+    return innings
+
+
+# -------------------------------
+# Validation
+# -------------------------------
+def load_over_for_ball(match_id, over_id, player_ids, scoring_ids=None):
+    """Fetch the over (with its match) in one query, or None if any id is unknown.
+
+    The same query counts the known players and the balls already bowled in
+    the over, finds the match's last ball sequence and counts the stats rows
+    of ``scoring_ids`` (the strikers and bowlers, by default every player),
+    so the hot path needs no further lookups before writing.
+    """
+    player_ids = {int(pid) for pid in player_ids}
+    scoring_ids = player_ids if scoring_ids is None else {int(pid) for pid in scoring_ids}
+    over = _over_for_ball(match_id, over_id, player_ids, scoring_ids).first()
+    return _known_over(over, player_ids, scoring_ids)
+
+
+async def aload_over_for_ball(match_id, over_id, player_ids, scoring_ids=None):
+    """load_over_for_ball() for async views, the same single query awaited."""
+    player_ids = {int(pid) for pid in player_ids}
+    scoring_ids = player_ids if scoring_ids is None else {int(pid) for pid in scoring_ids}
+    over = await _over_for_ball(match_id, over_id, player_ids, scoring_ids).afirst()
+    return _known_over(over, player_ids, scoring_ids)
+
+
+def _over_for_ball(match_id, over_id, player_ids, scoring_ids):
+    known_players = Player.objects.filter(pk__in=player_ids).annotate(
+        n=Func(F('pk'), function='COUNT')
+    ).values('n')
+    balls_so_far = Ball.objects.filter(over=OuterRef('pk')).annotate(
+        n=Func(F('pk'), function='COUNT')
+    ).values('n')
+    last_sequence = Ball.objects.filter(match=OuterRef('match_no')).annotate(
+        n=Func(F('sequence'), function='MAX')
+    ).values('n')
+    stats_rows = PlayerMatchStats.objects.filter(match=OuterRef('match_no'), player_id__in=scoring_ids).annotate(
+        n=Func(F('pk'), function='COUNT')
+    ).values('n')
+    return (
+        Over.objects.select_related('match_no')
+        .filter(pk=over_id, match_no_id=match_id)
+        .annotate(
+            known_players=Subquery(known_players),
+            balls_so_far=Subquery(balls_so_far),
+            last_sequence=Coalesce(Subquery(last_sequence), 0),
+            stats_rows=Subquery(stats_rows),
+        )
+    )
+
+
+def _known_over(over, player_ids, scoring_ids):
+    if over is None or over.known_players != len(player_ids):
+        return None
+    # every scorer already has a stats row when the counts agree
+    over.stats_ready = scoring_ids if over.stats_rows == len(scoring_ids) else set()
+    return over
+
+
+# -------------------------------
+# Incremental aggregates
+# -------------------------------
+def _overs_plus(field, legal_balls):
+    """SQL for ``field`` (cricket over notation) advanced by ``legal_balls`` deliveries."""
+    whole = Floor(F(field))
+    total = whole * 6 + Round((F(field) - whole) * 10) + legal_balls
+    return Round(Floor(total / 6) + Mod(total, 6) / 10, 1)
+
+
+def _update_sql(queryset, values):
+    """(sql, params) of ``queryset.update(**values)``, compiled without running it."""
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    query.clear_select_clause()
+    return query.get_compiler(queryset.db).as_sql()
+
+
+def run_updates(updates):
+    """Run ``(queryset, values)`` UPDATEs in order, in one round trip where the backend allows.
+
+    Oracle takes them together as one anonymous PL/SQL block; other backends
+    run one statement per call. Row counts are not reported, so use
+    ``queryset.update()`` where they matter.
+    """
+    statements = [_update_sql(queryset, values) for queryset, values in updates]
+    connection = connections[updates[0][0].db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'oracle' and len(statements) > 1:
+            block = ''.join(f'{statement};\n' for statement, _ in statements)
+            cursor.execute(f'BEGIN\n{block}END;\n/', [param for _, params in statements for param in params])
+        else:
+            for statement, params in statements:
+                cursor.execute(statement, params)
+
+
+def apply_balls(balls, match, over):
+    """Fold recorded balls of one over into the Over, PlayerMatchStats and Match totals.
+
+    Every counter moves with an F() increment, so concurrent scorers never
+    overwrite each other's totals, and however many balls there are each
+    table gets a single UPDATE, and the three go out together through
+    ``run_updates()``. Stats rows missing for a player's first ball are
+    created first; when ``over`` came from ``load_over_for_ball`` the players
+    known to have one are skipped.
+    """
+    runs = sum(ball.total_runs for ball in balls)
+    wickets = sum(ball.event == 'W' for ball in balls)
+    try:
+        codes = encode_balls(balls)
+    except ValueError:
+        codes = None
+
+    over_update = (Over.objects.filter(pk=over.pk), {
+        'runs': F('runs') + runs,
+        'wickets': F('wickets') + wickets,
+        # appended in the same UPDATE; a ball the code can't hold, or one past the
+        # column's length, leaves the over without one ('') rather than a wrong one
+        'deliveries': Value('') if codes is None else Case(
+            When(LessThanOrEqual(Length('deliveries'), MAX_LENGTH - len(codes)),
+                 deliveries__startswith=VERSION, then=Concat(F('deliveries'), Value(codes))),
+            default=Value(''),
+        ),
+    })
+
+    deltas = defaultdict(lambda: dict.fromkeys(('runs', 'balls', 'bowling_runs', 'wickets', 'legal'), 0))
+    for ball in balls:
+        striker, bowler = deltas[int(ball.striker_id)], deltas[int(ball.bowler_id)]
+        striker['runs'] += ball.runs
+        striker['balls'] += int(ball.event != 'WD')
+        bowler['bowling_runs'] += ball.total_runs
+        bowler['wickets'] += int(ball.event == 'W')
+        bowler['legal'] += int(ball.is_legal)
+
+    def per_player(key, player_ids):
+        return Case(
+            *[When(player_id=pid, then=Value(deltas[pid][key])) for pid in player_ids if deltas[pid][key]],
+            default=Value(0),
+        )
+
+    def stats_update(player_ids):
+        # All affected rows move together in one UPDATE
+        return PlayerMatchStats.objects.filter(match=match, player_id__in=player_ids), {
+            'runs': F('runs') + per_player('runs', player_ids),
+            'balls': F('balls') + per_player('balls', player_ids),
+            'bowling_runs': F('bowling_runs') + per_player('bowling_runs', player_ids),
+            'wickets': F('wickets') + per_player('wickets', player_ids),
+            'overs_bowled': Case(
+                *[When(player_id=pid, then=_overs_plus('overs_bowled', deltas[pid]['legal']))
+                  for pid in player_ids if deltas[pid]['legal']],
+                default=F('overs_bowled'),
+            ),
+        }
+
+    sides = defaultdict(lambda: [0, 0])
+    for ball in balls:
+        side = sides[batting_slot(match, over, ball.innings)]
+        side[0] += ball.total_runs
+        side[1] += int(ball.event == 'W')
+    changes = {}
+    for slot, (side_runs, side_wickets) in sides.items():
+        changes[f'team{slot}_runs'] = F(f'team{slot}_runs') + side_runs
+        changes[f'team{slot}_wickets'] = F(f'team{slot}_wickets') + side_wickets
+    match_update = (Match.objects.filter(pk=match.pk), changes)
+
+    player_ids = set(deltas)
+    unknown = player_ids - getattr(over, 'stats_ready', set())
+    if unknown:
+        # First ball for some of these players in this match, or rows not checked
+        _create_stats_rows(match, unknown, balls[0].user)
+    # Rows are never deleted while a match is scored, so no row count to check
+    run_updates([over_update, stats_update(player_ids), match_update])
+
+
+def _create_stats_rows(match, player_ids, user):
+    """Make sure each of ``player_ids`` has a PlayerMatchStats row for ``match``.
+
+    One INSERT that skips existing rows where the backend can; Oracle can't,
+    so there the rows that exist are looked up first.
+    """
+    rows = [PlayerMatchStats(match=match, player_id=pid, user=user) for pid in player_ids]
+    if connections[PlayerMatchStats.objects.db].features.supports_ignore_conflicts:
+        PlayerMatchStats.objects.bulk_create(rows, ignore_conflicts=True)
+        return
+    existing = set(PlayerMatchStats.objects.filter(
+        match=match, player_id__in=player_ids
+    ).values_list('player_id', flat=True))
+    missing = [row for row in rows if row.player_id not in existing]
+    if not missing:
+        return
+    try:
+        with transaction.atomic():
+            PlayerMatchStats.objects.bulk_create(missing)
+    except IntegrityError:
+        # A concurrent scorer created some of them first (unique per match and player)
+        for row in missing:
+            PlayerMatchStats.objects.get_or_create(match=match, player_id=row.player_id, defaults={'user': user})
+
+
+def apply_ball(ball, match, over):
+    apply_balls([ball], match, over)
+
+
+def announce_balls(balls, match, over):
+    """Send ``balls_recorded`` once the surrounding transaction commits."""
+    deltas = [ball_delta(ball, over, batting_slot(match, over, ball.innings)) for ball in balls]
+    transaction.on_commit(partial(balls_recorded.send, sender=Ball, match_id=match.id, deltas=deltas))
+
+
+def build_ball(user, over, ball_index, striker_id, non_striker_id, bowler_id, event,
+               innings=1, dismissed_id=None, sequence=None):
+    """Unsaved Ball for a scoring-UI event; raises ValueError for unknown events."""
+    code, runs, extras = parse_event(event)
+    return Ball(
+        user=user,
+        match=over.match_no,
+        innings=innings,
+        over=over,
+        ball_index=ball_index,
+        sequence=int(sequence) if sequence is not None else over.last_sequence + 1,
+        striker_id=striker_id,
+        non_striker_id=non_striker_id,
+        bowler_id=bowler_id,
+        dismissed_id=(dismissed_id or striker_id) if code == 'W' else None,
+        event=code,
+        runs=runs,
+        extras=extras,
+    )
+
+
+def record_ball(user, over, striker_id, non_striker_id, bowler_id, event,
+                innings=1, dismissed_id=None, sequence=None):
+    """Append a ball to the event log and update the derived totals.
+
+    ``over`` must come from ``load_over_for_ball`` so its match, ball count
+    and last sequence are already loaded. A wicket goes into the innings
+    state in the same transaction. Returns ``(ball, created)``: a
+    replayed client ``sequence`` changes nothing and returns the ball stored
+    the first time. Without one the ball takes the next free sequence, and
+    a concurrent scorer taking it first only moves this ball along.
+    """
+    for attempt in range(SEQUENCE_ATTEMPTS):
+        ball = build_ball(user, over, over.balls_so_far + 1, striker_id, non_striker_id,
+                          bowler_id, event, innings, dismissed_id, sequence)
+        try:
+            with transaction.atomic():
+                ball.save()
+                apply_ball(ball, over.match_no, over)
+                if ball.event == 'W':
+                    mark_out(over.match_no_id, [ball.dismissed_id])
+                announce_balls([ball], over.match_no, over)
+        except IntegrityError:
+            if sequence is None and attempt + 1 < SEQUENCE_ATTEMPTS:
+                _reload_counts(over)
+                continue
+            stored = None if sequence is None else Ball.objects.filter(
+                match=over.match_no, innings=ball.innings, sequence=ball.sequence
+            ).first()
+            if stored is None:
+                raise
+            return stored, False
+        return ball, True
+
+
+def _reload_counts(over):
+    """Re-read the over's ball count and the match's last sequence after losing a race."""
+    counts = Ball.objects.filter(match=over.match_no).aggregate(
+        last_sequence=Max('sequence'), balls_so_far=Count('pk', filter=Q(over=over)),
+    )
+    over.last_sequence = counts['last_sequence'] or 0
+    over.balls_so_far = counts['balls_so_far']
+
+
+def record_balls(user, over, events):
+    """Append a batch of balls for one over with a single INSERT and bulk updates.
+
+    ``events`` are dicts with the same keys as ``record_ball`` arguments
+    (including ``sequence``) and must already be in delivery order. Returns
+    ``(new_balls, duplicates)`` where duplicates are the stored balls for
+    sequences that had already been recorded.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                return _record_new_balls(user, over, events)
+        except IntegrityError:
+            # A concurrent retry inserted some of these first; the second pass skips
+            # them and numbers the rest after the balls now in the over
+            if attempt:
+                raise
+            _reload_counts(over)
+
+
+def _record_new_balls(user, over, events):
+    match = over.match_no
+    sequences = {(int(event.get('innings', 1)), int(event['sequence'])) for event in events}
+    stored = {
+        (ball.innings, ball.sequence): ball
+        for ball in Ball.objects.filter(
+            match=match,
+            innings__in={innings for innings, _ in sequences},
+            sequence__in={sequence for _, sequence in sequences},
+        )
+    }
+    fresh = [event for event in events
+             if (int(event.get('innings', 1)), int(event['sequence'])) not in stored]
+    duplicates = [ball for key, ball in stored.items() if key in sequences]
+
+    balls = [
+        build_ball(user, over, over.balls_so_far + position, **event)
+        for position, event in enumerate(fresh, start=1)
+    ]
+    if balls:
+        Ball.objects.bulk_create(balls)
+        apply_balls(balls, match, over)
+        dismissed = [ball.dismissed_id for ball in balls if ball.event == 'W']
+        if dismissed:
+            mark_out(match.id, dismissed)
+        announce_balls(balls, match, over)
+    return balls, duplicates
+
+
+# -------------------------------
+# Full rebuild
+# -------------------------------
+@transaction.atomic
+def rebuild_match(match):
+    """Recompute every total of ``match`` from its ball log, discarding the stored ones."""
+    if match.archived:
+        raise ValueError("An archived match has no ball log to rebuild from; restore it first")
+    overs = {over.id: over for over in Over.objects.filter(match_no=match)}
+    for over in overs.values():
+        over.runs = over.wickets = 0
+
+    batting = defaultdict(lambda: [0, 0])      # player_id -> [runs, balls]
+    bowling = defaultdict(lambda: [0, 0, 0])   # player_id -> [runs, wickets, legal balls]
+    sides = {1: [0, 0], 2: [0, 0]}             # batting slot -> [runs, wickets]
+
+    for ball in Ball.objects.filter(match=match).order_by('id'):
+        over = overs[ball.over_id]
+        is_wicket = int(ball.event == 'W')
+        over.runs += ball.total_runs
+        over.wickets += is_wicket
+
+        batting[ball.striker_id][0] += ball.runs
+        batting[ball.striker_id][1] += int(ball.event != 'WD')
+
+        bowling[ball.bowler_id][0] += ball.total_runs
+        bowling[ball.bowler_id][1] += is_wicket
+        bowling[ball.bowler_id][2] += int(ball.is_legal)
+
+        side = sides[batting_slot(match, over, ball.innings)]
+        side[0] += ball.total_runs
+        side[1] += is_wicket
+
+    Over.objects.bulk_update(overs.values(), ['runs', 'wickets'])
+
+    stats = {s.player_id: s for s in PlayerMatchStats.objects.filter(match=match)}
+    for player_id in (set(batting) | set(bowling)) - set(stats):
+        stats[player_id], _ = PlayerMatchStats.objects.get_or_create(
+            match=match, player_id=player_id, defaults={'user': match.user}
+        )
+    for player_id, row in stats.items():
+        row.runs, row.balls = batting.get(player_id, (0, 0))
+        bowling_runs, wickets, legal_balls = bowling.get(player_id, (0, 0, 0))
+        row.bowling_runs, row.wickets = bowling_runs, wickets
+        row.overs_bowled = balls_to_overs(legal_balls)
+    PlayerMatchStats.objects.bulk_update(
+        stats.values(), ['runs', 'balls', 'wickets', 'overs_bowled', 'bowling_runs']
+    )
+
+    match.team1_runs, match.team1_wickets = sides[1]
+    match.team2_runs, match.team2_wickets = sides[2]
+    match.save(update_fields=['team1_runs', 'team1_wickets', 'team2_runs', 'team2_wickets'])
+
+    from .scorecard import invalidate_scorecard  # scorecard builds on this module
+    transaction.on_commit(partial(invalidate_scorecard, match.id))
+    return match
@@ -0,0 +1,6 @@
+# score/signals.py
+from django.dispatch import Signal
+
+# Sent once the transaction that recorded balls has committed.
+# kwargs: match_id, deltas (list of score.live.ball_delta dicts, in order)
+balls_recorded = Signal()
@@ -0,0 +1,60 @@
+# score/state.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import InningsState
+
+
+# -------------------------------
+# Innings state store
+# -------------------------------
+# One InningsState row per match holds what used to live in the scorer's
+# session; reads go through the cache so the scoring hot path stays off the
+# database. Use a shared cache backend when running several workers.
+def _key(match_id):
+    return f'match-state:{match_id}'
+
+
+def _timeout():
+    return getattr(settings, 'MATCH_STATE_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_state(match_id):
+    """The match's state; unsaved (all defaults) if scoring has not started."""
+    state = cache.get(_key(match_id))
+    if state is None:
+        state = InningsState.objects.filter(match_id=match_id).first() or InningsState(match_id=match_id)
+        cache.set(_key(match_id), state, _timeout())
+    return state
+
+
+async def aget_state(match_id):
+    """get_state() for async views: the cache and the ORM are awaited, not called."""
+    state = await cache.aget(_key(match_id))
+    if state is None:
+        state = await InningsState.objects.filter(match_id=match_id).afirst() or InningsState(match_id=match_id)
+        await cache.aset(_key(match_id), state, _timeout())
+    return state
+
+
+def save_state(match_id, **changes):
+    """Create or update the match's state with ``changes`` and refresh the cache."""
+    state, _ = InningsState.objects.update_or_create(match_id=match_id, defaults=changes)
+    cache.set(_key(match_id), state, _timeout())
+    return state
+
+
+@transaction.atomic(savepoint=False)
+def mark_out(match_id, player_ids):
+    """Add dismissed batters to the state; row-locked so two scorers can't drop one.
+
+    Inside the transaction that records the wicket it adds no savepoint of its own.
+    """
+    state, _ = InningsState.objects.select_for_update().get_or_create(match_id=match_id)
+    new = [pid for pid in dict.fromkeys(map(int, player_ids)) if pid not in state.outed_ids]
+    if new:
+        state.outed_ids = state.outed_ids + new
+        state.save(update_fields=['outed_ids', 'updated_at'])
+    transaction.on_commit(lambda: cache.set(_key(match_id), state, _timeout()))
+    return state
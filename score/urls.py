@@ -2,7 +2,10 @@ from .views import (
     HomeView, PlayerListView, PlayerCreateView, PlayerUpdateView,
     PlayerDeleteView, TeamListView, TeamCreateView, TeamPlayersView,
     TeamDeleteView, MatchListView, MatchCreateView, MatchDeleteView,
-    TossDecisionView, OverListView,  OverScoreView,BasicOverCreationView
+    TossDecisionView, OverListView,  OverScoreView,BasicOverCreationView,
+    OverBatchScoreView, LiveScoreView, LiveScoreStreamView, ScorecardView,
+    MatchCompleteView, LeaderboardView, ExportView, ImportScorecardsView,
+    AsyncOverScoreView, AsyncScorecardView
 )
 from django.urls import path
 urlpatterns = [
@@ -20,8 +23,12 @@ urlpatterns = [
     path('matches/', MatchListView.as_view(), name='match_list'),
     path('matches/add/', MatchCreateView.as_view(), name='match_create'),
     path('matches/<int:pk>/delete/', MatchDeleteView.as_view(), name='match_delete'),
+    path('matches/<int:match_id>/complete/', MatchCompleteView.as_view(), name='match_complete'),
     path('match/<int:match_id>/toss/', TossDecisionView.as_view(), name='toss_decision'),
     path('overs/', OverListView.as_view(), name='over_list'),
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('export/<str:dataset>/', ExportView.as_view(), name='export'),
+    path('import/scorecards/', ImportScorecardsView.as_view(), name='import_scorecards'),
 
     # urls.py
     path("over/create/<int:match_id>/", BasicOverCreationView.as_view(), name="basic_over_create"),
@@ -30,6 +37,17 @@ urlpatterns = [
     path('over_score/<int:match_id>/<int:over_id>/<int:striker_id>/<int:non_striker_id>/<int:bowler_id>/', 
      OverScoreView.as_view(), name='over_score'),
      path('update_ball/<int:match_id>/<int:over_id>/', OverScoreView.as_view(), name='update_ball'),
+     path('update_balls/<int:match_id>/<int:over_id>/', OverBatchScoreView.as_view(), name='update_balls'),
+
+    path('match/<int:match_id>/scorecard/', ScorecardView.as_view(), name='scorecard'),
+
+    # async variants of the hot paths, for the ASGI deployment (cricket.asgi)
+    path('async/update_ball/<int:match_id>/<int:over_id>/', AsyncOverScoreView.as_view(), name='async_update_ball'),
+    path('async/match/<int:match_id>/scorecard/', AsyncScorecardView.as_view(), name='async_scorecard'),
+
+    # live scoreboard (the stream needs the ASGI server)
+    path('match/<int:match_id>/live/', LiveScoreView.as_view(), name='live_score'),
+    path('match/<int:match_id>/live/stream/', LiveScoreStreamView.as_view(), name='live_score_stream'),
    
 
 
@@ -4,27 +4,69 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
 from .models import Player, Team, Match, Over ,PlayerMatchStats
-from .forms import PlayerForm, PlayerSearchForm, TeamForm, MatchForm
-from django.http import JsonResponse, HttpResponse
+from .forms import PlayerForm, PlayerSearchForm, TeamForm, MatchForm, TeamSearchForm, MatchSearchForm
+from .pagination import keyset_page
+from .scoring import aload_over_for_ball, load_over_for_ball, parse_event, record_ball, record_balls
+from .live import broker
+from .scorecard import aget_scorecard, get_scorecard
+from .state import aget_state, get_state, save_state
+from .career import fold_match
+from .leaderboard import DEFAULT_MIN_BALLS, METRICS, Leaderboard
+from .export import DATASETS, FORMATS, export_rows, render_lines
+from .importer import READERS, ImportFormatError, ScorecardImporter
+from .overcode import decode_over, over_summary
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, Http404, StreamingHttpResponse
+import asyncio
+import io
 import json
+from functools import partial
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.core.exceptions import ValidationError
+from asgiref.sync import sync_to_async
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from access.models import AccessPermission
+from django.contrib.auth.views import redirect_to_login
+from access.permissions import get_resolver
+from cricket.instrumentation import budget_case
 
 # -------------------------------
 # Helper function to check permissions
 # -------------------------------
 def has_permission(user, obj, perm_type='R'):
-    if user == getattr(obj, 'user', None) or user.is_superuser:
-        return True
-    perms = AccessPermission.objects.filter(user=user, access_type=perm_type, active=True)
-    if isinstance(obj, Match):
-        return perms.filter(match=obj).exists()
-    elif isinstance(obj, Player):
-        return perms.filter(player=obj).exists()
-    elif isinstance(obj, Team):
-        return perms.filter(team=obj).exists()
-    return False
+    return get_resolver(user).can(obj, perm_type)
+
+
+def next_page_query(request, cursor):
+    """Current query string with ``cursor`` swapped in, for the "Next page" link."""
+    if not cursor:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return query.urlencode()
+
+
+def name_lookup(search_form, field='name'):
+    """Q for the search box: a prefix match when "starts with" is ticked (index-backed), else contains."""
+    term = search_form.cleaned_data.get('name')
+    if not term:
+        return Q()
+    lookup = 'istartswith' if search_form.cleaned_data.get('prefix') else 'icontains'
+    return Q(**{f'{field}__{lookup}': term})
+
+
+class KeysetListMixin:
+    """ListView pages walked by cursor (score.pagination) instead of OFFSET."""
+    keyset_ordering = ('id',)
+
+    def get_context_data(self, **kwargs):
+        try:
+            rows, next_cursor = keyset_page(self.object_list, self.keyset_ordering, self.request.GET.get('cursor'))
+        except ValueError:
+            rows, next_cursor = keyset_page(self.object_list, self.keyset_ordering)
+        context = super().get_context_data(object_list=rows, **kwargs)
+        context['next_query'] = next_page_query(self.request, next_cursor)
+        return context
 
 
 
@@ -36,24 +78,25 @@ class HomeView(LoginRequiredMixin, View):
 
 class PlayerListView(View):
     def get(self, request):
-        players = Player.objects.all()
-
-         # Filter by read access
-        players = [p for p in players if has_permission(request.user, p, 'R')]
-
+        # Filter by read access and search in the database, one page at a time
+        players = Player.objects.readable_by(request.user)
 
         search_form = PlayerSearchForm(request.GET or None)
         add_form = PlayerForm()
 
         if search_form.is_valid():
-            name = search_form.cleaned_data.get('name')
-            if name:
-                players = players.filter(name__icontains=name)
+            players = players.filter(name_lookup(search_form))
+
+        try:
+            page, next_cursor = keyset_page(players, ('name', 'id'), request.GET.get('cursor'))
+        except ValueError:
+            page, next_cursor = keyset_page(players, ('name', 'id'))
 
         return render(request, 'player_list.html', {
-            'players': players,
+            'players': page,
             'search_form': search_form,
             'add_form': add_form,
+            'next_query': next_page_query(request, next_cursor),
         })
 
     def post(self, request):
@@ -107,13 +150,24 @@ class PlayerDeleteView(LoginRequiredMixin,DeleteView):
 
 
 
-class TeamListView(LoginRequiredMixin,ListView):
+class TeamListView(LoginRequiredMixin, KeysetListMixin, ListView):
     model = Team
     template_name = 'team_list.html'
     context_object_name = 'teams'
+    keyset_ordering = ('name', 'id')
+
     def get_queryset(self):
-        qs = super().get_queryset()
-        return [t for t in qs if has_permission(self.request.user, t, 'R')]
+        self.search_form = TeamSearchForm(self.request.GET or None)
+        # each card lists its players: one extra query for the whole page
+        teams = Team.objects.readable_by(self.request.user).prefetch_related(
+            Prefetch('players', queryset=Player.objects.only('id', 'name').order_by('name'))
+        )
+        if self.search_form.is_valid():
+            teams = teams.filter(name_lookup(self.search_form))
+        return teams
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(search_form=self.search_form, **kwargs)
 
 
 class TeamCreateView(LoginRequiredMixin,CreateView):
@@ -159,14 +213,28 @@ class TeamDeleteView(LoginRequiredMixin,DeleteView):
         return super().dispatch(request, *args, **kwargs)
 
 
-class MatchListView(LoginRequiredMixin,ListView):
+class MatchListView(LoginRequiredMixin, KeysetListMixin, ListView):
     model = Match
     template_name = 'match_list.html'
     context_object_name = 'matches'
-    
+    keyset_ordering = ('-date', '-match_number', '-id')
+
     def get_queryset(self):
-        qs = super().get_queryset()
-        return [m for m in qs if has_permission(self.request.user, m, 'R')]
+        self.search_form = MatchSearchForm(self.request.GET or None)
+        matches = Match.objects.readable_by(self.request.user).select_related('team1', 'team2').only(
+            'id', 'match_number', 'date', 'team1__name', 'team2__name'
+        )
+        if self.search_form.is_valid():
+            # a team name on either side, or a match number
+            condition = name_lookup(self.search_form, 'team1__name') | name_lookup(self.search_form, 'team2__name')
+            term = self.search_form.cleaned_data.get('name')
+            if term and term.isdigit():
+                condition |= Q(match_number=int(term))
+            matches = matches.filter(condition)
+        return matches
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(search_form=self.search_form, **kwargs)
 
 
 class MatchCreateView(LoginRequiredMixin,View):
@@ -183,13 +251,7 @@ class MatchCreateView(LoginRequiredMixin,View):
             match = form.save(commit=False)
             match.user = request.user
             match.save()
-            overs_no = form.cleaned_data['total_overs']
-            request.session['total_overs'] = overs_no
-            team1 = form.cleaned_data['team1']
-            team2 = form.cleaned_data['team2']
-            request.session['total_overs'] = overs_no
-            request.session['team1'] = team1.id
-            request.session['team2'] = team2.id
+            # teams and total_overs live on the match itself
             return redirect('toss_decision', match_id=match.pk)
         return render(request, 'match_form.html', {'form': form})
 
@@ -207,6 +269,27 @@ class MatchDeleteView(LoginRequiredMixin, DeleteView):
         return super().dispatch(request, *args, **kwargs)
 
 
+class MatchCompleteView(LoginRequiredMixin, View):
+    def post(self, request, match_id):
+        match = get_object_or_404(Match.objects.select_related('team1', 'team2'), id=match_id)
+        if not has_permission(request.user, match, 'W'):
+            messages.error(request, "You don't have permission to complete this match.")
+            return redirect('match_list')
+
+        if not match.completed:
+            if match.team1_runs == match.team2_runs:
+                match.winners = "Tie"
+            else:
+                match.winners = (match.team1 if match.team1_runs > match.team2_runs else match.team2).name
+            match.completed = True
+            match.save(update_fields=['winners', 'completed'])
+            # Career totals pick the match up once it is committed as completed
+            transaction.on_commit(partial(fold_match, match.id))
+
+        messages.success(request, f"Match completed. Winners: {match.winners}")
+        return redirect('match_list')
+
+
 class TossDecisionView(View):
     def get(self, request, match_id):
         match = get_object_or_404(Match, id=match_id)
@@ -238,12 +321,14 @@ class TossDecisionView(View):
             batting_team = opponent_team
             bowling_team = toss_winner
 
-        # Save in session
-        request.session['batting_team_id'] = batting_team.id
-        request.session['bowling_team_id'] = bowling_team.id
-        request.session['toss_winner_id'] = toss_winner_id
-        request.session['toss_decision'] = decision
-        request.session['match_id'] = match.id
+        # Save in the match state store
+        save_state(
+            match.id,
+            toss_winner=toss_winner,
+            toss_decision="bat" if decision.lower() == "bat" else "bowl",
+            batting_team=batting_team,
+            bowling_team=bowling_team,
+        )
 
         messages.success(request, "Toss decision saved.")
         return redirect('basic_over_create', match_id=match.id)
@@ -252,21 +337,16 @@ class TossDecisionView(View):
 class BasicOverCreationView(View):
     def get(self, request, match_id):
         match = get_object_or_404(Match, id=match_id)
-        
-        batting_team_id = request.session.get('batting_team_id')
-        bowling_team_id = request.session.get('bowling_team_id')
+        state = get_state(match.id)
 
-        if not batting_team_id or not bowling_team_id:
-            messages.error(request, "Teams not set in session. Please redo toss.")
+        if not state.batting_team_id or not state.bowling_team_id:
+            messages.error(request, "Teams not set for this match. Please redo toss.")
             return redirect('toss_decision', match_id=match.id)
 
-        batting_team = Team.objects.get(id=batting_team_id)
-        bowling_team = Team.objects.get(id=bowling_team_id)
-
         context = {
             'match': match,
-            'batters': batting_team.players.all(),
-            'bowlers': bowling_team.players.all(),
+            'batters': Player.objects.filter(teams=state.batting_team_id),
+            'bowlers': Player.objects.filter(teams=state.bowling_team_id),
         }
         return render(request, 'basic_over_creation.html', context)
 
@@ -276,21 +356,33 @@ class BasicOverCreationView(View):
         striker_id = request.POST.get('striker')
         non_striker_id = request.POST.get('non_striker')
         bowler_id = request.POST.get('bowler')
+        state = get_state(match.id)
 
-        
+        if not state.bowling_team_id:
+            messages.error(request, "Teams not set for this match. Please redo toss.")
+            return redirect('toss_decision', match_id=match.id)
 
-        # Save Over object
-        over = Over.objects.create(
+        try:
+            bowler = Player.objects.get(id=bowler_id)
+        except (Player.DoesNotExist, TypeError, ValueError):
+            messages.error(request, "Please pick a bowler.")
+            return redirect('basic_over_create', match_id=match.id)
+
+        # Save Over object; a resubmitted form gets the over it already created
+        over, created = Over.objects.get_or_create(
             match_no=match,
-            bowling_team=Team.objects.get(id=request.session.get('bowling_team_id')),
+            bowling_team_id=state.bowling_team_id,
             over_no=1,  # ✅ automatic number
-            bowler=Player.objects.get(id=bowler_id),
-            runs=0,
-            wickets=0,
-            over_summary="",
-            user=request.user
+            defaults={"bowler": bowler, "runs": 0, "wickets": 0, "over_summary": "", "user": request.user},
         )
 
+        if created:
+            # Everyone else in the batting side is still to come in
+            batter_ids = Player.objects.filter(teams=state.batting_team_id).exclude(
+                id__in=[striker_id, non_striker_id]
+            ).values_list("id", flat=True)
+            save_state(match.id, bowler_id=bowler_id, batter_ids=list(batter_ids), outed_ids=[])
+
         return redirect(
             'over_score',
             match_id=match.id,
@@ -308,11 +400,21 @@ class OverListView(ListView):
     model = Over
     template_name = 'over_scoring_ui.html'
     context_object_name = 'overs'
+    queryset = Over.objects.select_related('bowler', 'match_no__team1', 'match_no__team2')
 
 
 
 
 
+def ball_result(ball, created=True):
+    """JSON result for a recorded ball; replays get the same body flagged as duplicate."""
+    if ball.event == "W":
+        message = "Wicket updated"
+    else:
+        message = f"{ball.total_runs} run(s) added"
+    return {"status": "success", "message": message, "seq": ball.sequence, "duplicate": not created}
+
+
 class OverScoreView(LoginRequiredMixin,View):
     def get(self, request, match_id, over_id, striker_id, non_striker_id, bowler_id):
         match = get_object_or_404(Match, id=match_id)
@@ -320,34 +422,30 @@ class OverScoreView(LoginRequiredMixin,View):
             messages.error(request, "You don't have access to this match.")
             return redirect('match_list')
 
-        batting_team_id = request.session.get('batting_team_id')
-        bowling_team_id = request.session.get('bowling_team_id')
+        state = get_state(match.id)
 
-        if not batting_team_id or not bowling_team_id:
-            messages.error(request, "Teams not set in session. Please redo toss.")
+        if not state.batting_team_id or not state.bowling_team_id:
+            messages.error(request, "Teams not set for this match. Please redo toss.")
             return redirect('toss_decision', match_id=match.id)
 
-        batting_team = get_object_or_404(Team, id=batting_team_id)
-        bowling_team = get_object_or_404(Team, id=bowling_team_id)
-
-        bowler_list = bowling_team.players.all()
-        striker = get_object_or_404(Player, id=striker_id)
-        non_striker = get_object_or_404(Player, id=non_striker_id)
-        bowler = get_object_or_404(Player, id=bowler_id)
-        request.session["bowler_id"]=bowler_id
+        bowler_list = Player.objects.filter(teams=state.bowling_team_id)
+        players = Player.objects.in_bulk([striker_id, non_striker_id, bowler_id])
+        if not {striker_id, non_striker_id, bowler_id} <= players.keys():
+            raise Http404("Player not found")
+        striker, non_striker, bowler = players[striker_id], players[non_striker_id], players[bowler_id]
+        if state.bowler_id != bowler.id:
+            state = save_state(match.id, bowler=bowler)
 
-        if "batter_list" not in request.session:
-            batter_list = batting_team.players.exclude(id__in=[striker.id, non_striker.id])
-            request.session['batter_list'] = list(batter_list.values_list("id", flat=True))
-            request.session['outed_players'] = []
+        outed_players = state.outed_ids
+        remaining_batters = Player.objects.filter(id__in=state.batter_ids).exclude(id__in=outed_players)
 
-        batter_ids = request.session.get('batter_list', [])
-        outed_players = request.session.get('outed_players', [])
-
-        remaining_batters = Player.objects.filter(id__in=batter_ids).exclude(id__in=outed_players)
-        
         over = get_object_or_404(Over, id=over_id)
-        total_overs = request.session.get('total_overs')
+        total_overs = match.total_overs
+        scorecard = get_scorecard(match.id)
+        batting = {}
+        for side in scorecard['sides'].values():
+            batting.update(side['batting'])
+        empty = {'runs': 0, 'balls': 0}
 
         return render(request, 'over_scoring_ui.html', {
             'match': match,
@@ -359,131 +457,396 @@ class OverScoreView(LoginRequiredMixin,View):
             'bowler': bowler,
             'remaining_batters': remaining_batters,
             'outed_players': Player.objects.filter(id__in=outed_players),
+            'next_sequence': scorecard['last_seq'] + 1,
+            'striker_card': batting.get(striker.id, empty),
+            'non_striker_card': batting.get(non_striker.id, empty),
         })
 
     def post(self, request, match_id, over_id):
-        match = get_object_or_404(Match, id=match_id)
-        over = get_object_or_404(Over, id=over_id)
+        data, error = ball_request(request)
+        if error:
+            return error
 
+        state = get_state(match_id)
+        try:
+            over = load_over_for_ball(match_id, over_id, *ball_players(data, state))
+        except (TypeError, ValueError):
+            over = None
+        if over is None:
+            return JsonResponse({"status": "error", "message": "Unknown match, over or player"}, status=404)
+        match = over.match_no
+
+        if not has_permission(request.user, match, "W"):
+            return JsonResponse({"status": "error", "message": "No write access"}, status=403)
+
+    # 🔵 Handle over completion event
+        if data["event"] == "OVER":
+            budget_case(request, "over")
+            return complete_over(request.user, over, state, data)
+
+    # 🟢 Every other event is a delivery: append it (and a wicket's batter) to the log
+        try:
+            ball, created = record_ball(request.user, over, **ball_fields(data, state))
+        except ValueError as exc:
+            return JsonResponse({"status": "error", "message": str(exc)}, status=400)
+
+        budget_case(request, ball_budget_case(over, [ball] if created else []))
+        return JsonResponse(ball_result(ball, created))
+
+
+# -------------------------------
+# update_ball pieces shared by the sync and async views
+# -------------------------------
+def ball_request(request):
+    """The update_ball body as ``(data, None)``, or ``(None, error response)``."""
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return None, JsonResponse({"status": "error", "message": "Invalid JSON"}, status=400)
+    if not all(data.get(key) for key in ("striker_id", "non_striker_id", "bowler_id", "event")):
+        return None, JsonResponse({"status": "error", "message": "Missing required fields"}, status=400)
+    return data, None
+
+
+def ball_players(data, state):
+    """load_over_for_ball() player arguments: every player the ball names, then the striker and bowler."""
+    fields = ball_fields(data, state)
+    players = [fields[key] for key in ("striker_id", "non_striker_id", "bowler_id", "dismissed_id") if fields[key]]
+    return players, [fields["striker_id"], fields["bowler_id"]]
+
+
+def ball_budget_case(over, balls):
+    """The REQUEST_BUDGETS case of a delivery request.
+
+    A scorer's first ball creates their stats row, and a wicket also writes the
+    innings state; a first ball that is a wicket does both. Every other ball
+    takes the view's own, tighter budget.
+    """
+    scorers = {int(pid) for ball in balls for pid in (ball.striker_id, ball.bowler_id)}
+    first_ball = not scorers <= over.stats_ready
+    wicket = any(ball.event == "W" for ball in balls)
+    if first_ball and wicket:
+        return "first_wicket"
+    if first_ball:
+        return "first_ball"
+    if wicket:
+        return "wicket"
+    return None
+
+
+def ball_fields(data, state):
+    """record_ball() keyword arguments for a delivery.
+
+    The match state's bowler wins over the client's, here and in the batch
+    endpoint: the client only names one before the state has any.
+    """
+    return {
+        "striker_id": data["striker_id"],
+        "non_striker_id": data["non_striker_id"],
+        "bowler_id": state.bowler_id or data["bowler_id"],
+        "event": data["event"],
+        "innings": data.get("innings", 1),
+        "dismissed_id": (data.get("outed_player") or {}).get("player_id"),
+        "sequence": data.get("seq"),
+    }
+
+
+def complete_over(user, over, state, data):
+    """Close ``over`` and open the next one with the new bowler (the OVER event)."""
+    match = over.match_no
+    new_bowler_id = data.get("new_bowler_id")
+
+    # ✅ validate the new bowler before anything is written
+    if not new_bowler_id:
+        return JsonResponse({"status": "error", "message": "New bowler not specified"}, status=400)
+
+    try:
+        new_bowler = Player.objects.get(id=new_bowler_id)
+    except (Player.DoesNotExist, TypeError, ValueError):
+        return JsonResponse({"status": "error", "message": "New bowler not found"}, status=404)
+
+    # the summary comes from the recorded deliveries; the client's text only for older overs
+    if decode_over(over.deliveries):
+        over.over_summary = over_summary(over.deliveries)[:100]
+    else:
+        over.over_summary = data.get("over_summary", "")
+    over.save(update_fields=["over_summary"])
+
+    # ✅ a retried OVER gets the over it already created (unique per match, side and number)
+    new_over, _ = Over.objects.get_or_create(
+        match_no=match,
+        bowling_team_id=state.bowling_team_id or over.bowling_team_id,
+        over_no=over.over_no + 1,
+        defaults={"bowler": new_bowler, "over_summary": "", "user": user},
+    )
+
+    # ✅ also store new bowler in the match state
+    save_state(match.id, bowler=new_bowler)
+
+    return JsonResponse({
+        "status": "success",
+        "message": "Over submitted successfully",
+        "new_over_id": new_over.id,
+        "new_bowler_id": new_bowler.id
+    })
+
+
+class AsyncOverScoreView(View):
+    """update_ball for the ASGI deployment: same body, same responses as OverScoreView.post.
+
+    The state, over and scorecard reads are awaited on the async ORM and
+    cache, so a worker serves other matches while they wait on the database.
+    The ball itself is written through sync_to_async, because the async ORM
+    cannot run the transaction that keeps the ball and the totals in step.
+    """
+
+    async def post(self, request, match_id, over_id):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        data, error = ball_request(request)
+        if error:
+            return error
+
+        state = await aget_state(match_id)
+        try:
+            over = await aload_over_for_ball(match_id, over_id, *ball_players(data, state))
+        except (TypeError, ValueError):
+            over = None
+        if over is None:
+            return JsonResponse({"status": "error", "message": "Unknown match, over or player"}, status=404)
+        match = over.match_no
+
+        if not await sync_to_async(has_permission)(user, match, "W"):
+            return JsonResponse({"status": "error", "message": "No write access"}, status=403)
+
+        if data["event"] == "OVER":
+            budget_case(request, "over")
+            return await sync_to_async(complete_over)(user, over, state, data)
+
+        try:
+            ball, created = await sync_to_async(record_ball)(user, over, **ball_fields(data, state))
+        except ValueError as exc:
+            return JsonResponse({"status": "error", "message": str(exc)}, status=400)
+
+        budget_case(request, ball_budget_case(over, [ball] if created else []))
+        return JsonResponse(ball_result(ball, created))
+
+
+class OverBatchScoreView(LoginRequiredMixin, View):
+    """Applies a queue of deliveries for one over in a single transaction.
+
+    Body: {"balls": [{"seq": 1, "striker_id": .., "non_striker_id": .., "bowler_id": ..,
+    "event": "4", "outed_player": {..}}, ...]}. Balls are applied in ``seq`` order;
+    sequences already recorded for the match are skipped, so a resent batch is safe.
+    The response lists the sequences this request wrote under ``applied`` and
+    the ones it found already recorded under ``duplicates``; an error names
+    the ``seq`` it is about where it can.
+    """
+
+    def post(self, request, match_id, over_id):
         try:
             data = json.loads(request.body.decode("utf-8"))
-        except json.JSONDecodeError:
+            queued = sorted(data["balls"], key=lambda item: int(item["seq"]))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
             return JsonResponse({"status": "error", "message": "Invalid JSON"}, status=400)
 
-        striker_id = data.get("striker_id")
-        non_striker_id = data.get("non_striker_id")
-        bowler_id = data.get("bowler_id")
-        event = data.get("event")
-        runs = int(event) if str(event).isdigit() else 0
-        
-       
+        current_bowler_id = get_state(match_id).bowler_id
+        events = []
+        seen = set()
+        for item in queued:
+            seq = int(item["seq"])
+            if seq in seen:
+                continue
+            seen.add(seq)
+            event = {
+                "sequence": seq,
+                "striker_id": item.get("striker_id"),
+                "non_striker_id": item.get("non_striker_id"),
+                "bowler_id": current_bowler_id or item.get("bowler_id"),  # as in ball_fields()
+                "event": item.get("event"),
+                "innings": item.get("innings", 1),
+                "dismissed_id": (item.get("outed_player") or {}).get("player_id"),
+            }
+            if not all([event["striker_id"], event["non_striker_id"], event["bowler_id"], event["event"]]):
+                return JsonResponse({"status": "error", "message": f"Missing required fields in ball {seq}",
+                                     "seq": seq}, status=400)
+            try:
+                parse_event(event["event"])
+            except ValueError as exc:
+                return JsonResponse({"status": "error", "message": f"Ball {seq}: {exc}", "seq": seq}, status=400)
+            events.append(event)
+
+        player_ids = {event[key] for event in events
+                      for key in ("striker_id", "non_striker_id", "bowler_id", "dismissed_id") if event[key]}
+        scoring_ids = {event[key] for event in events for key in ("striker_id", "bowler_id")}
+        try:
+            over = load_over_for_ball(match_id, over_id, player_ids, scoring_ids)
+        except (TypeError, ValueError):
+            over = None
+        if over is None:
+            return JsonResponse({"status": "error", "message": "Unknown match, over or player"}, status=404)
 
-        print("Received data:", data)
+        if not has_permission(request.user, over.match_no, "W"):
+            return JsonResponse({"status": "error", "message": "No write access"}, status=403)
 
-        if not all([striker_id, non_striker_id, bowler_id, event]):
-            return JsonResponse({"status": "error", "message": "Missing required fields"}, status=400)
+        try:
+            balls, duplicates = record_balls(request.user, over, events)
+        except ValueError as exc:
+            return JsonResponse({"status": "error", "message": str(exc)}, status=400)
 
-        if not has_permission(request.user, match, "W"):
-            return JsonResponse({"status": "error", "message": "No write access"}, status=403)
+        budget_case(request, ball_budget_case(over, balls))
 
-        striker = get_object_or_404(Player, id=striker_id)
-        bowler_id=request.session.get("bowler_id")
-        non_striker = get_object_or_404(Player, id=non_striker_id)
-        bowler = get_object_or_404(Player, id=bowler_id)
-        striker_stats, _ = PlayerMatchStats.objects.get_or_create(
-        match=match,
-        player_id=striker_id,
-        defaults={"user": request.user}
-        )
-        bowler_stats, _ = PlayerMatchStats.objects.get_or_create(
-        match=match,
-        player_id=bowler_id,
-        defaults={"user": request.user}
-           )
+        return JsonResponse({
+            "status": "success",
+            "message": f"{len(balls)} ball(s) saved",
+            "applied": [ball.sequence for ball in balls],
+            "duplicates": sorted(ball.sequence for ball in duplicates),
+        })
 
 
-    # 🟢 Handle scoring events (0–6)
-        if event in ["0", "1", "2", "3", "4", "6"]:
-            
-            
+class ScorecardView(View):
+    """JSON scorecard: batting cards, bowling figures, fall of wickets and rates."""
 
-            striker_stats.runs += runs
-            striker_stats.balls += 1
-            striker_stats.save()
+    def get(self, request, match_id):
+        match = get_object_or_404(Match, id=match_id)
+        if not has_permission(request.user, match, 'R'):
+            return JsonResponse({"status": "error", "message": "No read access"}, status=403)
+        return JsonResponse(get_scorecard(match.id))
 
-            bowler_stats.bowling_runs += runs
-            bowler_stats.overs_bowled += 0.1
-            bowler_stats.save()
 
-            over.runs += runs
-            over.save()
+class AsyncScorecardView(View):
+    """ScorecardView for the ASGI deployment; a cached card never leaves the event loop."""
 
-            return JsonResponse({"status": "success", "message": f"{runs} run(s) added"})
+    async def get(self, request, match_id):
+        user = await request.auser()
+        try:
+            match = await Match.objects.aget(id=match_id)
+        except Match.DoesNotExist:
+            raise Http404("Match not found")
+        if not await sync_to_async(has_permission)(user, match, 'R'):
+            return JsonResponse({"status": "error", "message": "No read access"}, status=403)
+        return JsonResponse(await aget_scorecard(match.id))
 
-    # 🟡 Handle wicket event
-        elif event == "W":
-            outed_player_data = data.get("outed_player", {})
-            player_id = outed_player_data.get("player_id", striker_id)
 
-            over.wickets += 1
-            over.save()
+class ExportView(LoginRequiredMixin, View):
+    """Stream a dataset the user can read as ?format=csv|jsonl, optionally one ?season=YYYY."""
 
-            striker_stats = PlayerMatchStats.objects.get(match=match, player_id=player_id)
-            striker_stats.balls += 1
-            striker_stats.save()
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise Http404("Unknown dataset")
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in FORMATS:
+            return JsonResponse({"status": "error", "message": "format must be csv or jsonl"}, status=400)
+        season = request.GET.get('season') or None
+        if season is not None and not season.isdigit():
+            return JsonResponse({"status": "error", "message": "season must be a year"}, status=400)
 
-            outed_players = request.session.get("outed_players", [])
-            if striker.id not in outed_players:
-                outed_players.append(striker.id)
-                request.session["outed_players"] = outed_players
+        columns, rows = export_rows(dataset, request.user, season and int(season))
+        response = StreamingHttpResponse(render_lines(columns, rows, fmt), content_type=FORMATS[fmt])
+        name = f"{dataset}-{season}" if season else dataset
+        response['Content-Disposition'] = f'attachment; filename="{name}.{fmt}"'
+        return response
 
-            return JsonResponse({"status": "success", "message": "Wicket updated"})
 
-    # 🔵 Handle over completion event
-        elif event == "OVER":
-            over_summary = data.get("over_summary", "")
-            new_bowler_id = data.get("new_bowler_id")
+class ImportScorecardsView(LoginRequiredMixin, View):
+    """POST a CSV, JSON or JSON Lines ``file`` of historical scorecards owned by the uploader.
 
-            bowler_stats.overs_bowled += 1
-            bowler_stats.save()
+    Answers with the import report; careers follow with the next fold job.
+    """
 
-            over.over_summary = over_summary
-            over.save()
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return JsonResponse({"status": "error", "message": "No file uploaded"}, status=400)
+        fmt = request.POST.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in READERS:
+            return JsonResponse({"status": "error", "message": "format must be csv, json or jsonl"}, status=400)
+
+        importer = ScorecardImporter(request.user, dry_run=request.POST.get('dry_run') == '1')
+        try:
+            importer.run(READERS[fmt](io.TextIOWrapper(upload.file, encoding='utf-8', newline='')))
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return JsonResponse({"status": "error", "message": str(exc)}, status=400)
+        return JsonResponse({"status": "ok", **importer.report()})
 
-            if not new_bowler_id:
-                return JsonResponse({"status": "error", "message": "New bowler not specified"}, status=400)
 
-            try:
-                new_bowler = Player.objects.get(id=new_bowler_id)
-            except Player.DoesNotExist:
-                return JsonResponse({"status": "error", "message": "New bowler not found"}, status=404)
-
-            bowling_team = match.team2  # Or use your match logic if needed
-
-            new_over = Over.objects.create(   # ✅ store created over
-         match_no=match,
-         bowling_team=bowling_team,
-         over_no=over.over_no + 1,
-         bowler=new_bowler,
-         runs=0,
-         wickets=0,
-         over_summary="",
-         user=request.user
-                       )
-
-    # ✅ also store new bowler in session if needed
-        request.session["bowler_id"] = new_bowler_id
+class LeaderboardView(LoginRequiredMixin, View):
+    """Top-N boards: ?metric=runs|wickets|strike_rate|economy plus optional
+    from/to dates, team, owner and min_balls filters; paged by ``cursor``."""
 
-        return JsonResponse({
-        "status": "success",
-        "message": "Over submitted successfully",
-        "new_over_id": new_over.id,
-        "new_bowler_id": new_bowler.id 
-                 })
+    def get(self, request):
+        params = request.GET
+        try:
+            board = Leaderboard(
+                request.user,
+                metric=params.get('metric', 'runs'),
+                date_from=params.get('from') or None,
+                date_to=params.get('to') or None,
+                team_id=params.get('team') or None,
+                owner_id=params.get('owner') or None,
+                min_balls=params.get('min_balls') or DEFAULT_MIN_BALLS,
+            )
+            rows, next_cursor = board.page(params.get('cursor') or None)
+        except (ValueError, ValidationError):
+            messages.error(request, "Invalid leaderboard filters.")
+            return redirect('leaderboard')
+
+        return render(request, 'leaderboard.html', {
+            'board': board,
+            'rows': rows,
+            'metrics': METRICS,
+            'next_query': next_page_query(request, next_cursor),
+            'teams': Team.objects.readable_by(request.user).only('id', 'name'),
+        })
 
 
-    # 🔴 Fallback (if unknown event)
-        
-        
+class LiveScoreView(View):
+    def get(self, request, match_id):
+        match = get_object_or_404(Match.objects.select_related('team1', 'team2'), id=match_id)
+        if not has_permission(request.user, match, 'R'):
+            messages.error(request, "You don't have access to this match.")
+            return redirect('match_list')
+        return render(request, 'live_score.html', {'match': match})
+
+
+class LiveScoreStreamView(View):
+    """Server-Sent Events stream of score deltas; serve it through cricket.asgi.
 
-#now in undo outed player
\ No newline at end of file
+    Viewers get the cached scorecard as one ``snapshot`` event and then a
+    ``ball`` event per delivery, fanned out in-process by ``score.live.broker``
+    rather than by polling.
+    """
+    keepalive_seconds = 15
+
+    async def get(self, request, match_id):
+        user = await request.auser()
+        try:
+            match = await Match.objects.select_related('team1', 'team2').aget(id=match_id)
+        except Match.DoesNotExist:
+            raise Http404("Match not found")
+        if not await sync_to_async(has_permission)(user, match, 'R'):
+            return HttpResponseForbidden("You don't have access to this match.")
+
+        response = StreamingHttpResponse(self.stream(match), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # keep nginx from buffering the stream
+        return response
+
+    async def stream(self, match):
+        # Subscribe before reading the snapshot so no ball falls in between;
+        # the client drops deltas whose seq the snapshot already covers.
+        queue = broker.subscribe(match.id)
+        try:
+            snapshot = await sync_to_async(get_scorecard)(match.id)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(match.id, queue)
+
+
+#now in undo outed player
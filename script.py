@@ -1,6 +1,6 @@
 import os
 import django
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cricket.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cricket.settings.select")
 django.setup()
 
 from django.conf import settings